@@ -0,0 +1,31 @@
+from flask import Flask, jsonify, request
+
+app = Flask(__name__)
+
+# Canned results so the search agent can be tested without the internet
+FAKE_RESULTS = {
+    "ollama": [
+        {"title": "Ollama", "snippet": "Get up and running with large language models locally."},
+        {"title": "Ollama on GitHub", "snippet": "Run Llama 3, Mistral and other models on your own machine."},
+    ],
+    "python": [
+        {"title": "Python.org", "snippet": "The official home of the Python programming language."},
+    ],
+}
+
+@app.route('/search', methods=['GET'])
+def search():
+    """
+    Fake search endpoint used by SearchTool's HTTPSearchBackend (day1/simple.py).
+    Example: GET http://127.0.0.1:5001/search?q=ollama&n=3
+    Run the agent with: SEARCH_BACKEND_URL=http://127.0.0.1:5001/search python simple.py
+    """
+    query = request.args.get('q', '').lower()
+    max_results = int(request.args.get('n', 3))
+
+    results = [r for keyword, hits in FAKE_RESULTS.items() if keyword in query for r in hits]
+    return jsonify(results[:max_results]), 200
+
+if __name__ == '__main__':
+    print("Fake search API running at http://127.0.0.1:5001/search")
+    app.run(port=5001, debug=True, use_reloader=False)
@@ -1,20 +1,97 @@
 import ollama
 from duckduckgo_search import DDGS
+from concurrent.futures import ThreadPoolExecutor
 import json
+import os
+import threading
+import time
+import urllib.parse
+import urllib.request
 
 # --- 1. Define the External Tool (Web Search) ---
-def search_web(query: str) -> str:
-    """A tool to perform a web search for up-to-date information."""
-    with DDGS() as ddgs:
+SEARCH_CACHE_TTL_SECONDS = 600
+MAX_PARALLEL_SEARCHES = 4
+
+class DDGSBackend:
+    """Searches DuckDuckGo, keeping one DDGS session per thread instead of one per query."""
+    def __init__(self):
+        self._local = threading.local()
+
+    def __call__(self, query: str, max_results: int = 3) -> list:
+        if not hasattr(self._local, "ddgs"):
+            self._local.ddgs = DDGS()
+        return [
+            {"title": r.get("title", ""), "snippet": r.get("body", r.get("snippet", ""))}
+            for r in self._local.ddgs.text(query, max_results=max_results)
+        ]
+
+class HTTPSearchBackend:
+    """
+    Searches any service answering GET <base_url>?q=<query>&n=<max_results> with a JSON list
+    of {"title", "snippet"} objects, e.g. a local fake search service for tests.
+    """
+    def __init__(self, base_url: str, timeout: float = 10.0):
+        self.base_url = base_url
+        self.timeout = timeout
+
+    def __call__(self, query: str, max_results: int = 3) -> list:
+        url = f"{self.base_url}?{urllib.parse.urlencode({'q': query, 'n': max_results})}"
+        with urllib.request.urlopen(url, timeout=self.timeout) as response:
+            return json.loads(response.read())
+
+class SearchTool:
+    """Web search with a TTL result cache keyed by normalized query and concurrent lookups."""
+    def __init__(self, backend=None, ttl: float = SEARCH_CACHE_TTL_SECONDS, max_workers: int = MAX_PARALLEL_SEARCHES):
+        self.backend = backend or DDGSBackend()
+        self.ttl = ttl
+        self._cache = {}  # normalized query -> (expires_at, formatted results)
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="search")
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        return " ".join(query.lower().split())
+
+    def search(self, query: str) -> str:
+        key = self.normalize(query)
+        with self._lock:
+            hit = self._cache.get(key)
+            if hit and hit[0] > time.monotonic():
+                return hit[1]
+
         # Get the top 3 results and return them as a formatted string
-        results = [r for r in ddgs.text(query, max_results=3)]
-        
+        results = self.backend(query, max_results=3)
         if not results:
-            return "No web results found."
-            
-        # Format results for the LLM to read easily
-        formatted_results = "\n".join([f"Title: {r['title']}, Snippet: {r['snippet']}" for r in results])
-        return f"Web Search Results for '{query}':\n{formatted_results}"
+            formatted = "No web results found."
+        else:
+            # Format results for the LLM to read easily
+            formatted_results = "\n".join([f"Title: {r['title']}, Snippet: {r['snippet']}" for r in results])
+            formatted = f"Web Search Results for '{query}':\n{formatted_results}"
+
+        with self._lock:
+            self._cache[key] = (time.monotonic() + self.ttl, formatted)
+        return formatted
+
+    def search_many(self, queries: list) -> list:
+        """Runs several searches at once; duplicate queries are only fetched once."""
+        unique = {}
+        for q in queries:
+            unique.setdefault(self.normalize(q), q)
+        futures = {key: self._pool.submit(self._safe_search, q) for key, q in unique.items()}
+        return [futures[self.normalize(q)].result() for q in queries]
+
+    def _safe_search(self, query: str) -> str:
+        try:
+            return self.search(query)
+        except Exception as e:
+            return f"Web search for '{query}' failed: {e}"
+
+# Point SEARCH_BACKEND_URL at a local fake search service to test without the internet
+search_tool = SearchTool(HTTPSearchBackend(os.environ["SEARCH_BACKEND_URL"]) if os.environ.get("SEARCH_BACKEND_URL") else None)
+
+def search_web(query: str) -> str:
+    """A tool to perform a web search for up-to-date information."""
+    return search_tool.search(query)
 
 # Ollama requires the tool to be described in a JSON dictionary
 TOOL_SEARCH_WEB = {
@@ -58,24 +135,30 @@ def run_agent(model_name="mistral"):
             tools=[TOOL_SEARCH_WEB] # Pass the tool definition
         )
 
-        # 3. Check for Tool Call (The Agentic Decision)
-        if agent_response.get('tool_calls'):
-            tool_call = agent_response['tool_calls'][0]['function']
-            tool_name = tool_call['name']
-            tool_args = json.loads(tool_call['arguments'])
-            
-            print(f"\n[AGENT ACTION]: Calling Tool: {tool_name} with args: {tool_args}")
-            
-            # Execute the tool function
-            if tool_name == 'search_web':
-                tool_output = search_web(**tool_args)
+        # 3. Check for Tool Calls (The Agentic Decision)
+        tool_calls = agent_response['message'].get('tool_calls') or []
+        if tool_calls:
+            messages.append(agent_response['message'])
+
+            # Run every search the model asked for at the same time
+            queries = []
+            for tool_call in tool_calls:
+                tool_name = tool_call['function']['name']
+                tool_args = tool_call['function']['arguments']
+                if isinstance(tool_args, str):
+                    tool_args = json.loads(tool_args)
+                print(f"\n[AGENT ACTION]: Calling Tool: {tool_name} with args: {tool_args}")
+                queries.append(tool_args.get('query', '') if tool_name == 'search_web' else None)
+
+            outputs = search_tool.search_many([q for q in queries if q is not None])
             
-            # 4. Pass Tool Output back to the LLM
-            messages.append(agent_response['tool_calls'][0])
-            messages.append({
-                "role": "tool",
-                "content": tool_output,
-            })
+            # 4. Pass Tool Outputs back to the LLM, in the order they were requested
+            for query in queries:
+                tool_output = outputs.pop(0) if query is not None else "Error: Unknown tool."
+                messages.append({
+                    "role": "tool",
+                    "content": tool_output,
+                })
             
             # Second LLM call to synthesize the final answer
             final_response = ollama.chat(
@@ -84,6 +167,7 @@ def run_agent(model_name="mistral"):
             )
             
             print(f"\n[AGENT RESPONSE]: {final_response['message']['content']}")
+            messages.append(final_response['message'])
             
         else:
             # 3b. No Tool Call, just respond
@@ -11,6 +11,7 @@ Start Ollama service (if not running):
 import ollama
 import json
 import time
+from label_classifier import classify_label
 
 # Default local model — change if you prefer mistral, phi3, qwen2, etc.
 DEFAULT_MODEL = "llama3"
@@ -51,9 +52,15 @@ Review: "{review}"
 Label:
 """
 
+REVIEW_LABELS = ["Positive", "Negative"]
+
 def classify_review(review):
+    # One constrained label token instead of up to 20 free-form tokens
     prompt = few_shot_template.format(review=review)
-    return send_completion(prompt, temperature=0.0, max_tokens=20)
+    try:
+        return classify_label([{"role": "user", "content": prompt}], REVIEW_LABELS, model=DEFAULT_MODEL, default="Unknown")
+    except Exception as e:
+        return f"Error: {e}"
 
 
 # ---------------------------------------------
@@ -0,0 +1,226 @@
+"""
+Batch runner for the LCEL chains in this folder.
+
+chain.invoke() handles one input at a time. For nightly jobs with thousands of inputs
+this runner:
+- reads the inputs from a JSONL or CSV file (one chain input per row, optional "id" column)
+- runs them with chain.abatch_as_completed under a max_concurrency cap
+- appends each result to a JSONL output file as soon as it finishes
+- retries failed inputs with exponential backoff
+- resumes: inputs that already have a successful result in the output file are skipped
+- reports throughput and the latency of each chain stage (prompt, model, parser, ...)
+
+Usage:
+    python batch_runner.py haiku topics.jsonl haiku_results.jsonl --max-concurrency 8
+    python batch_runner.py rag questions.csv rag_results.jsonl --retries 3
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+import statistics
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.runnables import Runnable
+
+
+# --- 1. The chains this runner knows about ---
+# name -> (module, attribute, input_key). With an input_key, that column is passed to the
+# chain as a plain string (the RAG chain takes the question itself, not a dict).
+CHAINS = {
+    "haiku": ("chain1", "chain", None),
+    "chef": ("chains", "chain", None),
+    "rag": ("rag.rag", "rag_chain", "question"),
+}
+
+def load_chain(name: str) -> Runnable:
+    import importlib
+    module, attribute, _ = CHAINS[name]
+    return getattr(importlib.import_module(module), attribute)
+
+
+# --- 2. Reading inputs and resuming ---
+def load_inputs(path: str) -> List[Dict[str, Any]]:
+    """Returns the rows of a .jsonl or .csv file. Rows without an "id" get their row number."""
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith(".csv"):
+            rows = list(csv.DictReader(f))
+        else:
+            rows = [json.loads(line) for line in f if line.strip()]
+    for i, row in enumerate(rows):
+        row.setdefault("id", i)
+    return rows
+
+def completed_ids(output_path: str) -> set:
+    """IDs that already have a successful result, so a rerun only does the rest."""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # a line cut short by a crash
+            if record.get("error") is None:
+                done.add(str(record["id"]))
+    return done
+
+
+# --- 3. Per-stage timing ---
+class StageTimer(BaseCallbackHandler):
+    """
+    Records how long each top-level step of the chain takes. With a sequence like
+    prompt | llm | parser those steps are the direct children of the root run.
+    """
+    run_inline = True  # runs on the event loop rather than in an executor thread
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self._runs = {}  # run_id -> (name, depth, start)
+
+    def _start(self, serialized, run_id, parent_run_id, kwargs):
+        parent = self._runs.get(parent_run_id)
+        depth = parent[1] + 1 if parent else 0
+        name = kwargs.get("name") or (serialized or {}).get("name", "unknown")
+        self._runs[run_id] = (name, depth, time.perf_counter())
+
+    def _end(self, run_id):
+        name, depth, start = self._runs.pop(run_id, (None, None, None))
+        if depth == 1:
+            self.latencies[name].append(time.perf_counter() - start)
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, **kwargs):
+        self._start(serialized, run_id, parent_run_id, kwargs)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, **kwargs):
+        self._start(serialized, run_id, parent_run_id, kwargs)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, parent_run_id=None, **kwargs):
+        self._start(serialized, run_id, parent_run_id, kwargs)
+
+    def on_retriever_start(self, serialized, query, *, run_id, parent_run_id=None, **kwargs):
+        self._start(serialized, run_id, parent_run_id, kwargs)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_retriever_end(self, documents, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._runs.pop(run_id, None)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._runs.pop(run_id, None)
+
+    def on_retriever_error(self, error, *, run_id, **kwargs):
+        self._runs.pop(run_id, None)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct * (len(ordered) - 1))))]
+
+
+# --- 4. The runner ---
+async def run_batch(
+    chain: Runnable,
+    rows: List[Dict[str, Any]],
+    output_path: str,
+    max_concurrency: int = 8,
+    retries: int = 2,
+    backoff: float = 1.0,
+    input_key: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Runs `chain` over `rows` and appends one JSON line per input to `output_path`:
+    {"id": ..., "output": ...} on success, {"id": ..., "error": ...} once retries run out.
+    """
+    done = completed_ids(output_path)
+    pending = [row for row in rows if str(row["id"]) not in done]
+    print(f"📦 {len(rows)} inputs, {len(rows) - len(pending)} already done, {len(pending)} to run")
+
+    timer = StageTimer()
+    config = {"max_concurrency": max_concurrency, "callbacks": [timer]}
+    succeeded, failed = 0, 0
+    start = time.perf_counter()
+
+    with open(output_path, "a", encoding="utf-8") as out:
+        for attempt in range(retries + 1):
+            if not pending:
+                break
+            if attempt:
+                delay = backoff * 2 ** (attempt - 1)
+                print(f"🔁 Retrying {len(pending)} failed input(s) in {delay:.1f}s (attempt {attempt + 1})")
+                await asyncio.sleep(delay)
+
+            inputs = [row[input_key] if input_key else {k: v for k, v in row.items() if k != "id"} for row in pending]
+            retry = []
+            async for i, result in chain.abatch_as_completed(inputs, config, return_exceptions=True):
+                row = pending[i]
+                if not isinstance(result, Exception):
+                    out.write(json.dumps({"id": row["id"], "output": result}, default=str) + "\n")
+                    succeeded += 1
+                elif attempt < retries:
+                    retry.append(row)
+                else:
+                    out.write(json.dumps({"id": row["id"], "error": f"{type(result).__name__}: {result}"}) + "\n")
+                    failed += 1
+                # Flushed per result so a crash loses at most the inputs still in flight
+                out.flush()
+            pending = retry
+
+    elapsed = time.perf_counter() - start
+    stats = {
+        "succeeded": succeeded,
+        "failed": failed,
+        "skipped": len(done),
+        "seconds": elapsed,
+        "throughput": succeeded / elapsed if elapsed else 0.0,
+        "stages": {
+            name: {
+                "count": len(values),
+                "mean": statistics.mean(values),
+                "p50": percentile(values, 0.50),
+                "p95": percentile(values, 0.95),
+            }
+            for name, values in timer.latencies.items()
+        },
+    }
+    print_report(stats)
+    return stats
+
+def print_report(stats: Dict[str, Any]):
+    print(f"\n✅ {stats['succeeded']} succeeded, ❌ {stats['failed']} failed, ⏭️ {stats['skipped']} skipped")
+    print(f"⏱️ {stats['seconds']:.2f}s wall time, {stats['throughput']:.2f} inputs/s")
+    if stats["stages"]:
+        print(f"\n{'stage':<40}{'count':>7}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+        for name, s in stats["stages"].items():
+            print(f"{name:<40}{s['count']:>7}{s['mean'] * 1000:>10.1f}{s['p50'] * 1000:>10.1f}{s['p95'] * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run an LCEL chain over a JSONL/CSV file of inputs.")
+    parser.add_argument("chain", choices=sorted(CHAINS))
+    parser.add_argument("inputs", help="JSONL or CSV file, one chain input per row")
+    parser.add_argument("output", help="JSONL results file (appended to, so reruns resume)")
+    parser.add_argument("--max-concurrency", type=int, default=8)
+    parser.add_argument("--retries", type=int, default=2)
+    args = parser.parse_args()
+
+    asyncio.run(run_batch(
+        load_chain(args.chain),
+        load_inputs(args.inputs),
+        args.output,
+        max_concurrency=args.max_concurrency,
+        retries=args.retries,
+        input_key=CHAINS[args.chain][2],
+    ))
@@ -15,10 +15,11 @@ prompt = ChatPromptTemplate.from_template(template)
 chain = prompt | llm | StrOutputParser()
 
 # 4. Invoke the Chain
-user_input = {"topic": "virtual reality"}
-print("--- Invoking Simple Chain ---")
-print(f"Input: {user_input['topic']}")
-result = chain.invoke(user_input)
+if __name__ == "__main__":
+    user_input = {"topic": "virtual reality"}
+    print("--- Invoking Simple Chain ---")
+    print(f"Input: {user_input['topic']}")
+    result = chain.invoke(user_input)
 
-print("\n✅ Haiku Output:")
-print(result)
\ No newline at end of file
+    print("\n✅ Haiku Output:")
+    print(result)
\ No newline at end of file
@@ -13,8 +13,9 @@ from prompttemplates import template
 chain = template | ollama_model | StrOutputParser()
 #StrOutputParser: Extracts the final text from the response object.
 
-# Invoke the chain, running the full sequence
-result = chain.invoke({"cuisine": "Mexican", "ingredient": "avocado"})
+if __name__ == "__main__":
+    # Invoke the chain, running the full sequence
+    result = chain.invoke({"cuisine": "Mexican", "ingredient": "avocado"})
 
-print("\n--- LCEL Chain Result (Ollama) ---")
-print(result)
\ No newline at end of file
+    print("\n--- LCEL Chain Result (Ollama) ---")
+    print(result)
\ No newline at end of file
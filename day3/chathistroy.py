@@ -1,8 +1,12 @@
 from langchain_core.prompts import MessagesPlaceholder, ChatPromptTemplate
 from langchain_core.messages import HumanMessage, AIMessage
-from langchain_core.runnables import RunnablePassthrough
+from langchain_core.runnables import RunnablePassthrough, RunnableLambda
 from langchain_community.chat_models import ChatOllama
 from langchain_core.output_parsers import StrOutputParser
+from collections import OrderedDict
+import hashlib
+import math
+import re
 
 # --- Setup: Define Model and History ---
 llm = ChatOllama(model="llama3", temperature=0)
@@ -37,16 +41,111 @@ contextualize_chain = (
     | StrOutputParser()
 )
 
-# --- 3. Example Execution ---
-new_question = "What is my name?"
+# --- 3. Fast Path: Skip Condensing When the Question Already Stands Alone ---
+# The condensing call is a full, sequential generation in front of every RAG query.
+# A cheap pre-check decides whether the follow-up actually refers to earlier turns.
 
-# The chain requires the full history and the new question
-input_data = {
-    "question": new_question,
-    "chat_history": chat_history # Pass the entire history list
+REFERENCE_WORDS = {
+    "it", "its", "they", "them", "their", "theirs", "this", "that", "these", "those",
+    "he", "him", "his", "she", "her", "hers", "there", "then", "former", "latter",
+    "again", "same", "above", "previous", "earlier", "else", "another", "other",
 }
+# Resolved from facts in the history. "me" is left out: "tell me"/"give me" requests stand alone
+SELF_WORDS = {"i", "my", "mine", "myself"}
+ONE_WORDS = {"one", "ones"}  # "Which one is better?" picks from something said earlier
+# "the movie?" / "the first book": a definite noun phrase with nothing after it to say which
+DEFINITE_REFERENCE = re.compile(r"\bthe(?: [a-z]+){1,2}\W*$")
+CONTINUATIONS = ("and ", "also ", "but ", "so ", "what about", "how about", "why not", "or ")
 
-standalone_question = contextualize_chain.invoke(input_data)
+def question_features(question: str) -> list[float]:
+    words = re.findall(r"[a-z']+", question.lower())
+    return [
+        1.0,                                                     # bias
+        float(sum(w in REFERENCE_WORDS for w in words)),
+        float(any(w in SELF_WORDS for w in words)),
+        float(question.lower().lstrip().startswith(CONTINUATIONS)),
+        float(len(words) <= 3),
+        float(bool(re.search(r"\s[A-Z][a-z]+", question))),      # names a specific entity
+        float(any(w in ONE_WORDS for w in words)),
+        float(bool(DEFINITE_REFERENCE.search(question.strip()))),
+    ]
+
+# Tiny labelled set: does the question need the conversation to make sense? (1 = yes)
+CLASSIFIER_EXAMPLES = [
+    ("What is the capital of France?", 0), ("How do I install Python on Windows?", 0),
+    ("Explain the theory of relativity in simple terms.", 0), ("Who wrote Pride and Prejudice?", 0),
+    ("What are the health benefits of green tea?", 0), ("List three sorting algorithms.", 0),
+    ("How tall is Mount Everest?", 0), ("Translate 'good morning' into Spanish.", 0),
+    ("What is the boiling point of water?", 0), ("Who painted the Mona Lisa?", 0),
+    ("How far is the Moon from the Earth?", 0), ("Name one famous French painter.", 0),
+    ("Tell me a joke about cats.", 0), ("Give me a recipe for pancakes.", 0),
+    ("What is my name?", 1), ("What does it mean?", 1), ("And what about the second one?", 1),
+    ("Why?", 1), ("Can you explain that again?", 1), ("How old is he?", 1),
+    ("Tell me more.", 1), ("Which of those is cheaper?", 1), ("Where do they live?", 1),
+    ("What did I say earlier?", 1), ("Which ones are on sale?", 1), ("Is the second one faster?", 1),
+    ("When was the film released?", 1), ("Who is the author?", 1), ("How long is the book?", 1),
+    ("How about Italy?", 1), ("And for Spain?", 1), ("But is it open on Sundays?", 1),
+]
+
+def train_standalone_classifier(examples, epochs: int = 500, lr: float = 0.3) -> list[float]:
+    """Plain logistic regression; a few hundred steps over ~20 examples take milliseconds."""
+    data = [(question_features(q), y) for q, y in examples]
+    weights = [0.0] * len(data[0][0])
+    for _ in range(epochs):
+        for x, y in data:
+            p = 1 / (1 + math.exp(-sum(w * f for w, f in zip(weights, x))))
+            weights = [w + lr * (y - p) * f for w, f in zip(weights, x)]
+    return weights
+
+CLASSIFIER_WEIGHTS = train_standalone_classifier(CLASSIFIER_EXAMPLES)
+
+def history_text(chat_history) -> str:
+    return "\n".join(f"{m.type}: {m.content}" for m in chat_history)
+
+def needs_condensing(question: str, chat_history) -> bool:
+    if not chat_history:
+        return False
+    score = sum(w * f for w, f in zip(CLASSIFIER_WEIGHTS, question_features(question)))
+    return 1 / (1 + math.exp(-score)) >= 0.5
+
+CONDENSE_CACHE_SIZE = 1024
+condense_cache: "OrderedDict[tuple, str]" = OrderedDict()
+condense_stats = {"skipped": 0, "cached": 0, "condensed": 0}
+
+def condense_question(question: str, chat_history) -> str:
+    """Returns a standalone question, calling the LLM only when it is really needed."""
+    if not needs_condensing(question, chat_history):
+        condense_stats["skipped"] += 1
+        return question
+
+    key = (hashlib.sha256(history_text(chat_history).encode()).hexdigest(), question.strip())
+    if key in condense_cache:
+        condense_stats["cached"] += 1
+        condense_cache.move_to_end(key)
+        return condense_cache[key]
+
+    condense_stats["condensed"] += 1
+    standalone = contextualize_chain.invoke({"question": question, "chat_history": chat_history})
+    condense_cache[key] = standalone
+    if len(condense_cache) > CONDENSE_CACHE_SIZE:
+        condense_cache.popitem(last=False)
+    return standalone
+
+# Drop-in replacement for contextualize_chain in a conversational RAG pipeline
+fast_contextualize_chain = RunnableLambda(lambda x: condense_question(x["question"], x["chat_history"]))
+
+# --- 4. Example Execution ---
+if __name__ == "__main__":
+    for new_question in ["What is my name?", "What is the capital of France?", "What is my name?"]:
+        # The chain requires the full history and the new question
+        input_data = {
+            "question": new_question,
+            "chat_history": chat_history # Pass the entire history list
+        }
+
+        standalone_question = fast_contextualize_chain.invoke(input_data)
+
+        print(f"Original Question: {new_question}")
+        print(f"Contextualized Question: {standalone_question}")
 
-print(f"Original Question: {new_question}")
-print(f"Contextualized Question: {standalone_question}")
\ No newline at end of file
+    print(f"\nCondensing stats: {condense_stats}")
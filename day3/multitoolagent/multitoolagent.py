@@ -1,11 +1,14 @@
 from langchain.agents import create_agent
 from langchain.tools import tool
 from langchain_ollama import ChatOllama
+from tool_cache import ToolCacheMiddleware, cacheable
 """``.
 Agent with Multiple Tools (Review/Search)
 This expands on the agent loop example by giving the LLM more options, requiring it to choose the right tool based on the context. We'll add a simple mock search tool.
 """
 # 1. Define Tools
+# Reviews change slowly, prices a little faster: both are cached for a while
+@cacheable(ttl=3600)
 @tool
 def get_product_review(product_name: str) -> str:
     """Provides a general sentiment and summary of product reviews."""
@@ -14,6 +17,7 @@ def get_product_review(product_name: str) -> str:
     else:
         return "Cannot find specific review data for this product."
 
+@cacheable(ttl=60)
 @tool
 def check_current_price(product_name: str) -> str:
     """Searches a mock database for the product's current sale price."""
@@ -31,7 +35,9 @@ ollama_model = ChatOllama(model="mistral", temperature=0)
 agent = create_agent(
     ollama_model, 
     tools=tools, 
-    system_prompt="You are an expert product advisor. Use the available tools to answer questions about price and reviews. If a user asks for both, use both tools sequentially."
+    # Both tool calls in one turn run concurrently; a separate turn per tool costs an extra LLM round trip
+    system_prompt="You are an expert product advisor. Use the available tools to answer questions about price and reviews. If a user asks for both, call both tools at once in the same turn.",
+    middleware=[ToolCacheMiddleware()],
 )
 
 # 4. Invoke the Agent (The agent must use two tools to answer this)
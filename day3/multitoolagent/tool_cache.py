@@ -0,0 +1,145 @@
+"""
+Tool result memoization for agents built with create_agent.
+
+Tools opt in with the @cacheable decorator, placed above @tool:
+
+    @cacheable(ttl=300)
+    @tool
+    def get_product_review(product_name: str) -> str:
+        ...
+
+    agent = create_agent(model, tools=tools, middleware=[ToolCacheMiddleware()])
+
+The middleware answers a repeated call (same tool, same arguments) from the cache until
+its TTL expires. Only successful results are stored: error ToolMessages never are, and a
+tool that reports failures as ordinary strings passes `should_cache` to say which
+results are worth keeping. Tools without @cacheable always run.
+
+The tool node in create_agent already runs every tool call from one model turn
+concurrently. When two calls with the same arguments arrive in one turn, one runs the
+tool and the other waits for its result (on both the sync and the async path).
+
+Each day folder is self-contained, so day6/ and day7/advanced/ keep identical copies of
+this file; change all three together.
+"""
+import asyncio
+import json
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from langchain.agents.middleware import AgentMiddleware
+from langchain_core.messages import ToolMessage
+from langchain_core.tools import BaseTool
+
+@dataclass(frozen=True)
+class CachePolicy:
+    ttl: float
+    should_cache: Optional[Callable[[Any], bool]] = None
+
+# tool name -> CachePolicy. Kept out of tool.metadata, which is copied into every
+# callback/tracing run and must stay serializable (should_cache is a callable).
+_policies: Dict[str, CachePolicy] = {}
+
+def cacheable(ttl: float = 300, should_cache: Optional[Callable[[Any], bool]] = None):
+    """
+    Marks a tool's results as safe to reuse for `ttl` seconds. `should_cache(content)`
+    can reject results that are really failures, e.g. lambda r: not r.startswith("ERROR").
+    """
+    def decorator(tool: BaseTool) -> BaseTool:
+        _policies[tool.name] = CachePolicy(ttl, should_cache)
+        return tool
+    return decorator
+
+
+class ToolCacheMiddleware(AgentMiddleware):
+    """Serves @cacheable tool calls from an in-memory TTL cache."""
+
+    def __init__(self, max_entries: int = 1024):
+        super().__init__()
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._cache: Dict[Tuple[str, str], Tuple[float, Any]] = {}  # key -> (expires_at, content)
+        self._key_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        # asyncio locks belong to one event loop, so they are kept per loop
+        self._async_key_locks = weakref.WeakKeyDictionary()  # loop -> {key: asyncio.Lock}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _policy(request) -> Optional[CachePolicy]:
+        return _policies.get(request.tool_call["name"])
+
+    @staticmethod
+    def _key(request) -> Tuple[str, str]:
+        call = request.tool_call
+        return call["name"], json.dumps(call["args"], sort_keys=True, default=str)
+
+    def _lookup(self, key, request):
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                self._cache.pop(key, None)
+                self.misses += 1
+                return None
+            self.hits += 1
+        print(f"♻️ Cache hit: {key[0]}({key[1]})")
+        return ToolMessage(content=entry[1], name=key[0], tool_call_id=request.tool_call["id"])
+
+    def _store(self, key, policy: CachePolicy, result) -> bool:
+        if not isinstance(result, ToolMessage) or result.status == "error":
+            return False
+        if policy.should_cache is not None and not policy.should_cache(result.content):
+            return False
+        with self._lock:
+            if len(self._cache) >= self.max_entries:
+                # Drop the entry closest to expiry
+                oldest = min(self._cache, key=lambda k: self._cache[k][0])
+                self._cache.pop(oldest)
+                self._key_locks.pop(oldest, None)
+            self._cache[key] = (time.monotonic() + policy.ttl, result.content)
+        return True
+
+    def _async_lock(self, key) -> asyncio.Lock:
+        with self._lock:
+            locks = self._async_key_locks.setdefault(asyncio.get_running_loop(), {})
+            return locks.setdefault(key, asyncio.Lock())
+
+    def wrap_tool_call(self, request, handler):
+        policy = self._policy(request)
+        if policy is None:
+            return handler(request)
+        key = self._key(request)
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        # Identical calls in one turn wait here, then hit the cache
+        with key_lock:
+            cached = self._lookup(key, request)
+            if cached is not None:
+                return cached
+            result = handler(request)
+            if not self._store(key, policy, result):
+                with self._lock:
+                    self._key_locks.pop(key, None)
+            return result
+
+    async def awrap_tool_call(self, request, handler):
+        policy = self._policy(request)
+        if policy is None:
+            return await handler(request)
+        key = self._key(request)
+        async with self._async_lock(key):
+            cached = self._lookup(key, request)
+            if cached is not None:
+                return cached
+            result = await handler(request)
+            self._store(key, policy, result)
+            return result
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._key_locks.clear()
+            self._async_key_locks.clear()
@@ -44,9 +44,9 @@ rag_chain = (
     | StrOutputParser()
 )
 
-print("\n--- RAG Chain Result ---")
-# The question "What does LCEL stand for?" will be answered using the retrieved document context.
-#rag_result = rag_chain.invoke("What is LCEL used for?")
-rag_result = rag_chain.invoke("What is the use of Ollamma ?")
-print(rag_result)
-#
\ No newline at end of file
+if __name__ == "__main__":
+    print("\n--- RAG Chain Result ---")
+    # The question "What does LCEL stand for?" will be answered using the retrieved document context.
+    #rag_result = rag_chain.invoke("What is LCEL used for?")
+    rag_result = rag_chain.invoke("What is the use of Ollamma ?")
+    print(rag_result)
\ No newline at end of file
@@ -3,20 +3,60 @@
 from langchain_ollama import ChatOllama
 from langchain_core.prompts import ChatPromptTemplate
 from pydantic import BaseModel, Field
+from typing import Annotated
 from langchain_core.output_parsers import PydanticOutputParser
+from langchain_core.exceptions import OutputParserException
+import time
 
 # 1. Define the desired output structure using Pydantic
 class Recipe(BaseModel):
     """Structured data about a simple dish."""
-    dish_name: str = Field(description="The name of the dish.")
-    ingredients: list[str] = Field(description="A list of key ingredients.")
+    # The length limits end up in the JSON schema, which sizes num_predict for constrained decoding
+    dish_name: str = Field(description="The name of the dish.", max_length=100)
+    ingredients: list[Annotated[str, Field(max_length=80)]] = Field(description="A list of key ingredients.", max_length=30)
     prep_time_minutes: int = Field(description="The estimated preparation time in minutes.")
 
 # 2. Setup the Parser and the Model
 parser = PydanticOutputParser(pydantic_object=Recipe)
 ollama_model = ChatOllama(model="llama3", temperature=0)
 
-# 3. Define the Prompt Template
+# "constrained": Ollama decodes against the JSON schema, so the output is always valid JSON
+# "prompted":    the original approach, schema described in the prompt as format_instructions
+STRUCTURED_MODE = "constrained"
+
+# Budgets for parts of the schema that declare no maxItems / maxLength
+UNBOUNDED_ARRAY_ITEMS = 50
+UNBOUNDED_STRING_TOKENS = 64
+NUM_PREDICT_CEILING = 2048   # generous cap; it only stops runaway generation
+
+def num_predict_for_schema(schema: dict, defs: dict = None) -> int:
+    """Upper bound on the tokens needed to emit one object matching the schema."""
+    defs = defs if defs is not None else schema.get("$defs", {})
+    if "$ref" in schema:
+        return num_predict_for_schema(defs[schema["$ref"].split("/")[-1]], defs)
+    kind = schema.get("type")
+    if kind == "object":
+        # Key names, quotes and punctuation, plus each value
+        return 4 + sum(len(name) // 3 + 4 + num_predict_for_schema(sub, defs)
+                       for name, sub in schema.get("properties", {}).items())
+    if kind == "array":
+        items = schema.get("maxItems", UNBOUNDED_ARRAY_ITEMS)
+        return 4 + items * (2 + num_predict_for_schema(schema.get("items", {}), defs))
+    if kind in ("integer", "number", "boolean"):
+        return 6
+    if "maxLength" in schema:
+        return 4 + schema["maxLength"] // 2   # at least ~2 characters per token, plus quotes
+    return UNBOUNDED_STRING_TOKENS
+
+recipe_schema = Recipe.model_json_schema()
+constrained_model = ChatOllama(
+    model="llama3",
+    temperature=0,
+    format=recipe_schema,                              # constrained decoding against the schema
+    num_predict=min(num_predict_for_schema(recipe_schema), NUM_PREDICT_CEILING),  # no room for rambling past the object
+)
+
+# 3. Define the Prompt Templates
 prompt = ChatPromptTemplate.from_messages(
     [
         ("system", "You are an expert chef. Your goal is to extract recipe information from the user's text and format it perfectly as JSON according to the following schema:\n{format_instructions}"),
@@ -24,16 +64,54 @@ prompt = ChatPromptTemplate.from_messages(
     ]
 ).partial(format_instructions=parser.get_format_instructions())
 
-# 4. Create the Chain and Invoke
-structured_chain = prompt | ollama_model | parser
+# The schema is enforced by the decoder, so the long format instructions can be dropped
+constrained_prompt = ChatPromptTemplate.from_messages(
+    [
+        ("system", "You are an expert chef. Extract the recipe information from the user's text as JSON."),
+        ("human", "{user_input}")
+    ]
+)
+
+# 4. Create the Chains and Invoke
+prompted_chain = prompt | ollama_model | parser
+constrained_chain = constrained_prompt | constrained_model | parser
+structured_chain = constrained_chain if STRUCTURED_MODE == "constrained" else prompted_chain
+
+def benchmark(inputs: list[str]):
+    """
+    Compares the prompted and constrained chains: outputs cut off by num_predict
+    (done_reason == "length"), other parse failures, and latency.
+    """
+    print(f"\n{'mode':<14}{'truncated':>10}{'failures':>10}{'avg s':>10}")
+    for name, generate in (("prompted", prompt | ollama_model), ("constrained", constrained_prompt | constrained_model)):
+        truncated, failures, start = 0, 0, time.perf_counter()
+        for text in inputs:
+            message = generate.invoke({"user_input": text})
+            if message.response_metadata.get("done_reason") == "length":
+                truncated += 1
+                continue
+            try:
+                parser.invoke(message)
+            except OutputParserException:
+                failures += 1
+        elapsed = (time.perf_counter() - start) / len(inputs)
+        print(f"{name:<14}{truncated:>10}{failures:>10}{elapsed:>10.2f}")
+
+if __name__ == "__main__":
+    user_input = "Tell me about a quick recipe for scrambled eggs. It should take about 5 minutes."
 
-user_input = "Tell me about a quick recipe for scrambled eggs. It should take about 5 minutes."
+    print(f"--- Structured Output Chain Result ({STRUCTURED_MODE}) ---")
+    # The result will be a Pydantic object (or a dict if the parser is omitted)
+    recipe_object = structured_chain.invoke({"user_input": user_input})
 
-print("--- Structured Output Chain Result ---")
-# The result will be a Pydantic object (or a dict if the parser is omitted)
-recipe_object = structured_chain.invoke({"user_input": user_input})
+    print(f"Dish Name (Type: {type(recipe_object.dish_name)}): {recipe_object.dish_name}")
+    print(f"Ingredients List (Type: {type(recipe_object.ingredients)}): {recipe_object.ingredients}")
+    print(f"Preparation Time (Type: {type(recipe_object.prep_time_minutes)}): {recipe_object.prep_time_minutes}")
 
-print(f"Dish Name (Type: {type(recipe_object.dish_name)}): {recipe_object.dish_name}")
-print(f"Ingredients List (Type: {type(recipe_object.ingredients)}): {recipe_object.ingredients}")
-print(f"Preparation Time (Type: {type(recipe_object.prep_time_minutes)}): {recipe_object.prep_time_minutes}")
-#
\ No newline at end of file
+    benchmark([
+        user_input,
+        "I make pancakes on Sundays: flour, milk, eggs and butter, about 20 minutes.",
+        "Guacamole! Mash avocados with lime, onion, cilantro and salt. Ten minutes tops.",
+        "A slow beef stew with carrots, potatoes and red wine that takes three hours.",
+        "Just toast with butter.",
+    ])
@@ -1,13 +1,98 @@
 import requests
 import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from pydantic import BaseModel, Field
 from langchain_core.tools import tool
 from langchain_ollama import ChatOllama
 from langchain_core.messages import HumanMessage, AIMessage, ToolMessage
 from langchain_core.prompts import ChatPromptTemplate
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 
-# --- 1. Define the API Tool ---
+# --- 1. Define the Price Service and API Tools ---
+
+# Point COINGECKO_API_URL at a local stub (see fake_coingecko_api.py) to test offline
+COINGECKO_API_URL = os.environ.get("COINGECKO_API_URL", "https://api.coingecko.com/api/v3")
+PRICE_CACHE_TTL_SECONDS = 30     # how long a quote is served from the cache
+COALESCE_WINDOW_SECONDS = 0.02   # requests arriving within this window share one API call
+
+class _Batch:
+    def __init__(self):
+        self.pairs = set()          # (coin_id, currency) pairs waiting for this call
+        self.done = threading.Event()
+        self.error = None
+
+class PriceService:
+    """
+    Serves crypto quotes from a short-TTL cache. Cache misses that arrive within a few
+    milliseconds of each other are coalesced into ONE /simple/price call, since the
+    endpoint accepts comma-separated 'ids' and 'vs_currencies'.
+    """
+    def __init__(self, base_url: str = COINGECKO_API_URL, ttl: float = PRICE_CACHE_TTL_SECONDS,
+                 coalesce_window: float = COALESCE_WINDOW_SECONDS):
+        self.base_url = base_url
+        self.ttl = ttl
+        self.coalesce_window = coalesce_window
+        self.session = requests.Session()   # keep-alive connection reuse
+        self._cache: Dict[Tuple[str, str], Tuple[float, float]] = {}  # pair -> (expires_at, price)
+        self._lock = threading.Lock()
+        self._batch = None
+        self.upstream_calls = 0
+
+    def get_prices(self, coin_ids: List[str], currencies: List[str]) -> Dict[str, Dict[str, Optional[float]]]:
+        """Returns {coin_id: {currency: price or None}} for every requested pair."""
+        pairs = {(c.lower(), v.lower()) for c in coin_ids for v in currencies}
+        now = time.monotonic()
+
+        with self._lock:
+            missing = {p for p in pairs if p not in self._cache or self._cache[p][0] <= now}
+            batch = None
+            if missing:
+                # Join the batch that is currently collecting requests, or open a new one
+                if self._batch is None:
+                    self._batch = _Batch()
+                    threading.Timer(self.coalesce_window, self._flush).start()
+                batch = self._batch
+                batch.pairs |= missing
+
+        if batch is not None:
+            batch.done.wait()
+            if batch.error:
+                raise batch.error
+
+        with self._lock:
+            result: Dict[str, Dict[str, Optional[float]]] = {}
+            for coin, cur in pairs:
+                hit = self._cache.get((coin, cur))
+                result.setdefault(coin, {})[cur] = hit[1] if hit else None
+            return result
+
+    def _flush(self):
+        with self._lock:
+            batch, self._batch = self._batch, None
+        try:
+            params = {
+                "ids": ",".join(sorted({c for c, _ in batch.pairs})),
+                "vs_currencies": ",".join(sorted({v for _, v in batch.pairs})),
+            }
+            self.upstream_calls += 1
+            response = self.session.get(f"{self.base_url}/simple/price", params=params, timeout=5)
+            response.raise_for_status()
+            data = response.json()
+
+            expires_at = time.monotonic() + self.ttl
+            with self._lock:
+                for coin, quotes in data.items():
+                    for cur, price in quotes.items():
+                        self._cache[(coin, cur)] = (expires_at, price)
+        except requests.exceptions.RequestException as e:
+            batch.error = e
+        finally:
+            batch.done.set()
+
+price_service = PriceService()
 
 class CryptoPriceInput(BaseModel):
     """Input schema for the get_crypto_price tool."""
@@ -21,18 +106,8 @@ def get_crypto_price(coin_id: str, currency: str) -> str:
     Use this tool only when the user asks for a price, e.g., 'What is the price of Bitcoin?'.
     """
     try:
-        url = "https://api.coingecko.com/api/v3/simple/price"
-        params = {
-            "ids": coin_id.lower(),
-            "vs_currencies": currency.lower()
-        }
-        
-        response = requests.get(url, params=params, timeout=5)
-        response.raise_for_status()
-        data = response.json()
-        
         # Check if the data is valid and extract the price
-        price_data = data.get(coin_id.lower(), {}).get(currency.lower())
+        price_data = price_service.get_prices([coin_id], [currency])[coin_id.lower()][currency.lower()]
         
         if price_data is not None:
             print(f"✅ [TOOL EXECUTION SUCCESS]: Fetched price for {coin_id}.")
@@ -43,8 +118,32 @@ def get_crypto_price(coin_id: str, currency: str) -> str:
     except requests.exceptions.RequestException as e:
         return f"An error occurred while fetching the price: The API is unavailable or request failed."
 
+class CryptoPricesInput(BaseModel):
+    """Input schema for the get_crypto_prices tool."""
+    coin_ids: List[str] = Field(description="The IDs of the cryptocurrencies, e.g., ['bitcoin', 'ethereum', 'cardano'].")
+    currencies: List[str] = Field(description="The fiat currencies to check the prices in, e.g., ['usd', 'eur'].")
+
+@tool("get_crypto_prices", args_schema=CryptoPricesInput)
+def get_crypto_prices(coin_ids: List[str], currencies: List[str]) -> str:
+    """
+    Returns the current prices of several cryptocurrencies in one call.
+    Use this tool for portfolio questions that involve more than one coin.
+    """
+    try:
+        prices = price_service.get_prices(coin_ids, currencies)
+    except requests.exceptions.RequestException as e:
+        return f"An error occurred while fetching the prices: The API is unavailable or request failed."
+
+    print(f"✅ [TOOL EXECUTION SUCCESS]: Fetched prices for {len(prices)} coin(s).")
+    lines = []
+    for coin, quotes in prices.items():
+        for cur, price in quotes.items():
+            found = f"{price} {cur.upper()}" if price is not None else f"no price data in {cur.upper()}"
+            lines.append(f"{coin.capitalize()}: {found}")
+    return "\n".join(sorted(lines))
+
 # Define the list of tools and the map for execution
-tools = [get_crypto_price]
+tools = [get_crypto_price, get_crypto_prices]
 tools_map: Dict[str, Any] = {tool.name: tool for tool in tools}
 
 
@@ -63,7 +162,7 @@ llm_with_tools = llm.bind_tools(tools)
 # Define the prompt template
 prompt = ChatPromptTemplate.from_messages(
     [
-        ("system", "You are an intelligent financial assistant. Use the 'get_crypto_price' tool ONLY when asked for a specific coin price. If the tool is used, provide a clear, final answer based on the tool's result."),
+        ("system", "You are an intelligent financial assistant. Use the 'get_crypto_price' tool ONLY when asked for a specific coin price, and 'get_crypto_prices' when several coins are involved. If the tool is used, provide a clear, final answer based on the tool's result."),
         ("placeholder", "{messages}"), 
     ]
 )
@@ -73,6 +172,21 @@ runnable = prompt | llm_with_tools
 
 # --- 3. Implement the Correct Manual Agent Loop ---
 
+TOOL_TIMEOUT_SECONDS = 10.0
+# Independent tool calls from one AI message run side by side in this pool
+tool_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="tool")
+
+def run_tool_call(tool_call: Dict[str, Any]) -> str:
+    tool_name = tool_call["name"]
+    # The 'args' are often returned as a dictionary; we ensure it's a dict for invocation
+    tool_args = tool_call.get("args", {}) 
+    
+    if tool_name not in tools_map:
+        raise ValueError(f"Unknown tool: {tool_name}")
+    
+    # Call the actual Python function (the tool)
+    return tools_map[tool_name].invoke(tool_args)
+
 def run_manual_agent(user_input: str) -> str:
     """
     Manually runs the Agent/Tool loop by inspecting the AIMessage's tool_calls attribute.
@@ -97,23 +211,27 @@ def run_manual_agent(user_input: str) -> str:
     print(f"⚙️ LLM requested {len(ai_message.tool_calls)} tool call(s)...")
     messages.append(ai_message) # Add the AI's tool call message to history
     
-    # 2. Execute the tool(s) and prepare results
-    for tool_call in ai_message.tool_calls:
-        tool_name = tool_call["name"]
-        # The 'args' are often returned as a dictionary; we ensure it's a dict for invocation
-        tool_args = tool_call.get("args", {}) 
-        tool_id = tool_call["id"] # Required to link the result back to the tool call
-        
-        if tool_name not in tools_map:
-            raise ValueError(f"Unknown tool: {tool_name}")
-        
-        # Call the actual Python function (the tool)
-        tool_output_string = tools_map[tool_name].invoke(tool_args)
+    # 2. Execute the tool(s) concurrently and prepare results
+    futures = [tool_pool.submit(run_tool_call, tool_call) for tool_call in ai_message.tool_calls]
+    # Each day folder is self-contained, so this fan-out is duplicated on purpose in
+    # day5/agentcollabaration/hierachial.py (execute_tools); keep the two in step.
+    # All calls start together, so they share one deadline
+    deadline = time.monotonic() + TOOL_TIMEOUT_SECONDS
+
+    for tool_call, future in zip(ai_message.tool_calls, futures):
+        try:
+            tool_output_string = future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FutureTimeoutError:
+            tool_output_string = f"Error: Tool {tool_call['name']} timed out after {TOOL_TIMEOUT_SECONDS:.0f}s."
+        except Exception as e:
+            # One failing tool must not sink the others
+            tool_output_string = f"Error: Tool {tool_call['name']} failed: {e}"
         
-        # 3. Create a ToolMessage with the result and the linked tool_call_id
+        # 3. Create a ToolMessage with the result and the linked tool_call_id,
+        # appended in the same order the LLM requested the calls
         tool_message = ToolMessage(
             content=tool_output_string,
-            tool_call_id=tool_id,
+            tool_call_id=tool_call["id"], # Required to link the result back to the tool call
         )
         messages.append(tool_message) # Add the tool's output to the history
         
@@ -153,7 +271,7 @@ If populated (Tool is called):
 
 The loop extracts the tool name, arguments (args), and the unique tool ID.
 
-It executes the corresponding function from the tools_map using the extracted arguments.
+It executes the corresponding functions from the tools_map concurrently in a thread pool, each with a timeout; a failing call becomes an error message instead of stopping the others.
 
 Send Result Back: The output from the executed tool (e.g., "The price is $68,000 USD") is wrapped in a ToolMessage (linked by the tool_call_id) and appended to the message history.
 
@@ -0,0 +1,36 @@
+from flask import Flask, jsonify, request
+
+app = Flask(__name__)
+
+# Mock price table (coin id -> currency -> price)
+PRICES = {
+    "bitcoin": {"usd": 68000.0, "eur": 62500.0},
+    "ethereum": {"usd": 3500.0, "eur": 3220.0},
+    "cardano": {"usd": 0.45, "eur": 0.41},
+    "solana": {"usd": 150.0, "eur": 138.0},
+}
+
+calls = 0
+
+@app.route('/api/v3/simple/price', methods=['GET'])
+def simple_price():
+    """
+    Local stand-in for CoinGecko's /simple/price endpoint.
+    Example: GET http://127.0.0.1:5002/api/v3/simple/price?ids=bitcoin,ethereum&vs_currencies=usd,eur
+    Run the agent with: COINGECKO_API_URL=http://127.0.0.1:5002/api/v3 python cryptopricechecker.py
+    """
+    global calls
+    calls += 1
+    ids = [i for i in request.args.get('ids', '').lower().split(',') if i]
+    currencies = [c for c in request.args.get('vs_currencies', '').lower().split(',') if c]
+    print(f"[STUB] call #{calls}: ids={ids} vs_currencies={currencies}")
+
+    # Like the real API, unknown coins and currencies are simply left out
+    return jsonify({
+        coin: {cur: PRICES[coin][cur] for cur in currencies if cur in PRICES[coin]}
+        for coin in ids if coin in PRICES
+    }), 200
+
+if __name__ == '__main__':
+    print("Fake CoinGecko API running at http://127.0.0.1:5002/api/v3")
+    app.run(port=5002, debug=True, use_reloader=False)
@@ -8,8 +8,12 @@ from langchain_core.messages import HumanMessage, AIMessage
 
 # --- CORRECTED IMPORTS ---
 from langchain_ollama import ChatOllama
-# 🔑 Import the File-Based History class
-from langchain_community.chat_message_histories import FileChatMessageHistory 
+# 🔑 Import the append-only File-Based History class (see jsonl_history.py)
+from jsonl_history import JSONLChatMessageHistory
+# 🔑 Keeps the last N tokens verbatim and summarizes the rest (see history_policy.py)
+from history_policy import RollingSummaryPolicy
+# 🔑 Moves history writes off the response path (see write_behind.py)
+from write_behind import WriteBehindWriter
 
 
 # --- SETUP ---
@@ -22,17 +26,19 @@ if not os.path.exists(HISTORY_DIR):
     os.makedirs(HISTORY_DIR)
     print(f"--- INFO: Created history directory: {HISTORY_DIR}")
 
+# 🔑 Buffers new messages in memory and writes them to the files in the background,
+# so file I/O stays off the response path (flushed on exit as well)
+write_behind = WriteBehindWriter(flush_interval=0.5, max_batch=32)
+
 
 def get_session_history(session_id: str) -> BaseChatMessageHistory:
     """
-    A factory function to create a FileChatMessageHistory instance for a session ID.
-    The history will be saved to a specific JSON file in the HISTORY_DIR.
+    A factory function to get the buffered JSONLChatMessageHistory for a session ID.
+    The history will be saved to a specific JSONL file in the HISTORY_DIR.
     """
-    file_path = os.path.join(HISTORY_DIR, f"{session_id}.json")
-    
-    # 🔑 We return a new instance of FileChatMessageHistory, 
-    # which automatically handles loading and saving to the file_path.
-    return FileChatMessageHistory(file_path)
+    file_path = os.path.join(HISTORY_DIR, f"{session_id}.jsonl")
+    # 🔑 Each new message is appended as one line instead of rewriting the whole file.
+    return write_behind.history(session_id, lambda: JSONLChatMessageHistory(file_path))
 
 # Initialize the Ollama model.
 try:
@@ -61,12 +67,15 @@ prompt = ChatPromptTemplate.from_messages(
 
 # 3. Create the Chain with History
 
-base_chain = prompt | llm
+# Trim the injected history: recent turns verbatim, older turns as a running summary
+history_policy = RollingSummaryPolicy(llm, max_recent_tokens=1000)
+
+base_chain = history_policy.as_runnable() | prompt | llm
 
 # Wrap the chain with history management
 chain_with_history = RunnableWithMessageHistory(
     runnable=base_chain,
-    # This now calls our factory function which returns a FileChatMessageHistory instance
+    # This now calls our factory function which returns a buffered JSONLChatMessageHistory
     get_session_history=get_session_history,
     input_messages_key="input", 
     history_messages_key="history",
@@ -77,7 +86,7 @@ chain_with_history = RunnableWithMessageHistory(
 
 if __name__ == "__main__":
     session_id = "user-file-session-001"
-    history_file = os.path.join(HISTORY_DIR, f"{session_id}.json")
+    history_file = os.path.join(HISTORY_DIR, f"{session_id}.jsonl")
 
     print(f"\n{'='*70}")
     print(f"--- Starting File-Based Conversation (ID: {session_id}) ---")
@@ -92,7 +101,7 @@ if __name__ == "__main__":
     response_1 = chain_with_history.invoke(first_input, config=config)
     print(f"[ASSISTANT 1]: {response_1.content}")
     
-    # At this point, the history file (user-file-session-001.json) has been created/updated.
+    # At this point, the history file (user-file-session-001.jsonl) has been created/updated.
     print(f"\n--- INFO: History saved to file. ---")
 
 
@@ -107,13 +116,15 @@ if __name__ == "__main__":
     # --- History Check from the file ---
     print("\n--- History Check (Verifying File Content) ---")
     try:
-        # 🔑 Create a new history object to read the final state from the file
-        final_history_manager = FileChatMessageHistory(history_file)
-        history_messages = final_history_manager.messages
+        # 🔑 Flush batched writes, then re-open the file to read the final state
+        get_session_history(session_id).flush()
+        final_history_manager = JSONLChatMessageHistory(history_file)
+        history_messages = final_history_manager.get_last_messages(2)
         
-        print(f"Total messages stored in file: {len(history_messages)}")
+        print(f"Total messages stored in file: {len(final_history_manager)}")
         print(f"Last Human Message: {history_messages[-2].content}")
         print(f"Last AI Response: {history_messages[-1].content}")
+        final_history_manager.close()
         
     except Exception as e:
         print(f"❌ Error reading final history file: {e}")
\ No newline at end of file
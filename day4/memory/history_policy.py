@@ -0,0 +1,232 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.runnables import RunnableLambda, RunnablePassthrough
+
+# First-person statements worth keeping word for word ("My cat's name is Mittens.")
+FACT_PATTERN = re.compile(
+    r"\b(my [^.?!]+? (?:is|are|was) [^.?!]+"
+    r"|i (?:am|live in|work (?:at|as|for)|was born|like|love|prefer|have) [^.?!]+"
+    r"|i'm [^.?!]+)",
+    re.IGNORECASE,
+)
+
+SUMMARY_PROMPT = """Progressively summarize the conversation below.
+Keep names, numbers and decisions. Reply with the new summary only.
+
+Current summary:
+{summary}
+
+New lines of conversation:
+{lines}
+
+New summary:"""
+
+
+# Identifies the last message(s) of a processed stretch of history
+Marker = Tuple[str, ...]
+
+
+@dataclass
+class _SessionState:
+    summary: str = ""
+    summarized_marker: Optional[Marker] = None   # last messages folded into the summary
+    pending: bool = False                        # a background summary update is running
+    facts: List[str] = field(default_factory=list)
+    scanned_marker: Optional[Marker] = None      # last messages already scanned for facts
+
+
+class RollingSummaryPolicy:
+    """
+    Keeps roughly the last `max_recent_tokens` of history verbatim and folds older turns
+    into a running summary, so the prompt stops growing with the conversation.
+
+    The summary is updated in a background thread: until it catches up, the turns it
+    is still working on are sent verbatim, so nothing is ever dropped. Facts the user
+    states about themselves are pinned and always sent, whatever the summary says.
+
+    Progress is tracked by message identity, not by list position, so the history may
+    be a sliding window (e.g. the last 50 rows from SQL) or be reloaded shorter than it
+    was. State is kept for the `max_sessions` most recently used sessions.
+    """
+
+    def __init__(
+        self,
+        llm,
+        max_recent_tokens: int = 1000,
+        max_facts: int = 20,
+        max_sessions: int = 1000,
+        token_counter: Callable[[Sequence[BaseMessage]], int] = count_tokens_approximately,
+    ):
+        self.llm = llm
+        self.max_recent_tokens = max_recent_tokens
+        self.max_facts = max_facts
+        self.token_counter = token_counter
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, _SessionState]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="summarizer")
+        self._futures = set()   # in-flight summary updates; each removes itself when done
+
+    # --- Public API ---
+
+    def apply(self, messages: Sequence[BaseMessage], session_id: str) -> List[BaseMessage]:
+        """Returns the history to inject into the prompt for this turn."""
+        messages = list(messages)
+        keys = [self._message_key(m) for m in messages]
+        with self._lock:
+            state = self._session(session_id, reset=not messages)
+
+            self._pin_facts(state, messages, keys)
+
+            summarized = self._position(keys, state.summarized_marker)
+            boundary = self._recent_boundary(messages)
+            if boundary > summarized and not state.pending:
+                state.pending = True
+                older = messages[summarized:boundary]
+                marker = self._marker(keys, boundary)
+                future = self._executor.submit(self._update_summary, session_id, state, older, marker)
+                self._futures.add(future)
+                future.add_done_callback(self._futures.discard)
+
+            header = self._header(state)
+            verbatim = messages[min(summarized, boundary):]
+
+        return ([header] if header else []) + verbatim
+
+    def as_runnable(self, history_key: str = "history"):
+        """A step to put in front of the prompt: `policy.as_runnable() | prompt | llm`."""
+        def _apply(inputs, config):
+            session_id = config["configurable"]["session_id"]
+            return self.apply(inputs[history_key], session_id)
+
+        return RunnablePassthrough.assign(**{history_key: RunnableLambda(_apply)})
+
+    def wait(self):
+        """Blocks until every scheduled summary update has finished."""
+        for future in list(self._futures):
+            future.result()
+
+    # --- Internals ---
+
+    def _session(self, session_id: str, reset: bool) -> _SessionState:
+        """Caller holds self._lock. An empty history means a new or cleared session."""
+        if reset or session_id not in self._sessions:
+            self._sessions[session_id] = _SessionState()
+        self._sessions.move_to_end(session_id)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+        return self._sessions[session_id]
+
+    @staticmethod
+    def _message_key(message: BaseMessage) -> str:
+        if message.id:
+            return message.id
+        return hashlib.sha1(f"{message.type}:{message.content}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _marker(keys: List[str], end: int) -> Optional[Marker]:
+        """The keys of the (up to) two messages before `end`; two so repeated texts rarely collide."""
+        return tuple(keys[max(0, end - 2):end]) or None
+
+    @staticmethod
+    def _position(keys: List[str], marker: Optional[Marker]) -> int:
+        """
+        Index just past the marked messages. If they are no longer in the list (a sliding
+        window moved past them), everything in it is new.
+        """
+        if marker is None:
+            return 0
+        for end in range(len(keys), len(marker) - 1, -1):
+            if tuple(keys[end - len(marker):end]) == marker:
+                return end
+        return 0
+
+    def _recent_boundary(self, messages: List[BaseMessage]) -> int:
+        """
+        Index of the first message that still fits in the verbatim window. The last
+        exchange is always kept, even when it alone is over the token budget.
+        """
+        boundary, used = len(messages), 0
+        while boundary > 0:
+            cost = self.token_counter([messages[boundary - 1]])
+            if used + cost > self.max_recent_tokens:
+                break
+            used += cost
+            boundary -= 1
+        # Never start the window with a dangling AI reply
+        while boundary < len(messages) and isinstance(messages[boundary], AIMessage):
+            boundary += 1
+        last_human = next((i for i in range(len(messages) - 1, -1, -1) if isinstance(messages[i], HumanMessage)), None)
+        last_exchange = last_human if last_human is not None else max(len(messages) - 1, 0)
+        return min(boundary, last_exchange)
+
+    def _pin_facts(self, state: _SessionState, messages: List[BaseMessage], keys: List[str]):
+        for message in messages[self._position(keys, state.scanned_marker):]:
+            if not isinstance(message, HumanMessage) or not isinstance(message.content, str):
+                continue
+            for match in FACT_PATTERN.finditer(message.content):
+                fact = match.group(0).strip()
+                fact = fact[0].upper() + fact[1:]
+                if fact not in state.facts:
+                    state.facts.append(fact)
+        state.facts = state.facts[-self.max_facts:]
+        state.scanned_marker = self._marker(keys, len(keys))
+
+    @staticmethod
+    def _header(state: _SessionState):
+        parts = []
+        if state.facts:
+            parts.append("Facts the user has stated:\n" + "\n".join(f"- {f}" for f in state.facts))
+        if state.summary:
+            parts.append("Summary of the earlier conversation:\n" + state.summary)
+        return SystemMessage(content="\n\n".join(parts)) if parts else None
+
+    def _update_summary(self, session_id: str, state: _SessionState, older: List[BaseMessage], marker: Marker):
+        try:
+            lines = "\n".join(f"{m.type}: {m.content}" for m in older)
+            prompt = SUMMARY_PROMPT.format(summary=state.summary or "(empty)", lines=lines)
+            summary = self.llm.invoke(prompt).content.strip()
+        except Exception as e:
+            print(f"⚠️ Summary update failed for session {session_id}: {e}")
+            with self._lock:
+                state.pending = False
+            return
+
+        with self._lock:
+            # Ignore the result if the session was reset while we were summarizing
+            if self._sessions.get(session_id) is state:
+                state.summary = summary
+                state.summarized_marker = marker
+            state.pending = False
+
+
+if __name__ == "__main__":
+    from langchain_ollama import ChatOllama
+
+    llm = ChatOllama(model="mistral", temperature=0.0)
+    policy = RollingSummaryPolicy(llm, max_recent_tokens=60)
+
+    history = [
+        HumanMessage(content="My cat's name is Mittens. What is the tallest mountain on Earth?"),
+        AIMessage(content="Mount Everest, at 8,849 metres, is the tallest mountain above sea level."),
+        HumanMessage(content="What country is it located in?"),
+        AIMessage(content="It sits on the border between Nepal and China (Tibet)."),
+        HumanMessage(content="Which is the second tallest?"),
+        AIMessage(content="K2, on the border of Pakistan and China, at 8,611 metres."),
+    ]
+    print("First pass (summary runs in the background):")
+    for m in policy.apply(history, "demo"):
+        print(f"  [{m.type}] {m.content}")
+
+    policy.wait()
+    print("\nAfter the summary caught up:")
+    for m in policy.apply(history, "demo"):
+        print(f"  [{m.type}] {m.content}")
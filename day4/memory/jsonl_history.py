@@ -0,0 +1,195 @@
+import json
+import os
+import threading
+import time
+from typing import List, Sequence
+
+from langchain_core.chat_history import BaseChatMessageHistory
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+
+
+def _parse(line: bytes):
+    """Returns the record on this line, or None if it is not a complete JSON record."""
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None
+
+
+class JSONLChatMessageHistory(BaseChatMessageHistory):
+    """
+    Append-only chat history stored as one JSON record per line.
+
+    FileChatMessageHistory re-reads and rewrites the whole JSON file on every append,
+    so a long session costs O(n^2) I/O. Here an append writes only the new lines,
+    fsync is batched, and an in-memory offset index makes tail reads a single seek.
+    clear() appends a marker instead of rewriting; compact() drops the dead records.
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        fsync_every: int = 16,
+        fsync_interval: float = 1.0,
+        compact_ratio: float = 0.5,
+    ):
+        self.file_path = file_path
+        self.fsync_every = fsync_every          # fsync after this many unsynced records...
+        self.fsync_interval = fsync_interval    # ...or once this many seconds have passed
+        self.compact_ratio = compact_ratio      # compact when this share of the file is dead
+        self._lock = threading.Lock()
+        self._offsets: List[int] = []           # byte offset of every live message record
+        self._dead_bytes = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+        if os.path.dirname(file_path):
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        self._file = open(file_path, "a+b")
+        self._build_index()
+
+    # --- Index ---
+
+    def _build_index(self):
+        """
+        Scans the file once on open; later appends keep the index up to date. fsync is
+        batched, so a crash can leave a torn last record: it is truncated away here.
+        """
+        self._file.seek(0)
+        offset = 0
+        for line in self._file:
+            record = _parse(line)
+            if record is None:
+                if not line.endswith(b"\n") or not self._file.read(1):
+                    print(f"⚠️ {self.file_path}: dropping a partial last record at byte {offset}")
+                    self._file.truncate(offset)
+                    break
+                # A damaged record in the middle of the file: keep it out of the index
+                print(f"⚠️ {self.file_path}: skipping an unreadable record at byte {offset}")
+                self._file.seek(offset + len(line))
+            elif record.get("type") == "clear":
+                self._dead_bytes = offset + len(line)
+                self._offsets = []
+            else:
+                self._offsets.append(offset)
+            offset += len(line)
+
+    def _read_from(self, offset: int) -> List[BaseMessage]:
+        self._file.flush()
+        self._file.seek(offset)
+        records = [_parse(line) for line in self._file]
+        return messages_from_dict([r for r in records if r is not None and r.get("type") != "clear"])
+
+    # --- BaseChatMessageHistory API ---
+
+    @property
+    def messages(self) -> List[BaseMessage]:
+        with self._lock:
+            if not self._offsets:
+                return []
+            return self._read_from(self._offsets[0])
+
+    def get_last_messages(self, n: int) -> List[BaseMessage]:
+        """Reads only the last n messages by seeking straight to their offset."""
+        with self._lock:
+            if n <= 0 or not self._offsets:
+                return []
+            return self._read_from(self._offsets[-min(n, len(self._offsets))])
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def add_messages(self, messages: Sequence[BaseMessage]) -> None:
+        lines = [
+            (json.dumps(message_to_dict(m), ensure_ascii=False) + "\n").encode("utf-8")
+            for m in messages
+        ]
+        with self._lock:
+            self._file.seek(0, os.SEEK_END)
+            offset = self._file.tell()
+            for line in lines:
+                self._offsets.append(offset)
+                offset += len(line)
+            # One write call for the whole batch; the file is opened in append mode
+            self._file.write(b"".join(lines))
+            self._file.flush()
+            self._unsynced += len(lines)
+            self._maybe_sync()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._file.seek(0, os.SEEK_END)
+            self._file.write(b'{"type": "clear"}\n')
+            self._file.flush()
+            self._dead_bytes = self._file.tell()
+            self._offsets = []
+            self._unsynced += 1
+            self._maybe_sync()
+            self._maybe_compact()
+
+    # --- Durability and compaction ---
+
+    def _maybe_sync(self, force: bool = False):
+        due = time.monotonic() - self._last_sync >= self.fsync_interval
+        if self._unsynced and (force or due or self._unsynced >= self.fsync_every):
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+            self._last_sync = time.monotonic()
+
+    def _maybe_compact(self):
+        size = self._file.tell()
+        if size and self._dead_bytes / size >= self.compact_ratio:
+            self._compact()
+
+    def _compact(self):
+        """Rewrites the file with only the live records, then atomically swaps it in."""
+        self._file.flush()
+        self._file.seek(self._dead_bytes)
+        live = self._file.read()
+        tmp_path = self.file_path + ".compact"
+        with open(tmp_path, "wb") as tmp:
+            tmp.write(live)
+            tmp.flush()
+            os.fsync(tmp.fileno())
+        self._file.close()
+        os.replace(tmp_path, self.file_path)
+        self._file = open(self.file_path, "a+b")
+        self._offsets = [o - self._dead_bytes for o in self._offsets]
+        self._dead_bytes = 0
+
+    def compact(self) -> None:
+        with self._lock:
+            if self._dead_bytes:
+                self._compact()
+
+    def flush(self) -> None:
+        """Forces any batched records to disk."""
+        with self._lock:
+            self._maybe_sync(force=True)
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._maybe_sync(force=True)
+                self._file.close()
+
+
+if __name__ == "__main__":
+    from langchain_core.messages import AIMessage, HumanMessage
+
+    path = os.path.join("chat_histories", "jsonl-demo.jsonl")
+    if os.path.exists(path):
+        os.remove(path)
+
+    history = JSONLChatMessageHistory(path)
+    start = time.perf_counter()
+    for i in range(2000):
+        history.add_messages([HumanMessage(content=f"Question {i}"), AIMessage(content=f"Answer {i}")])
+    elapsed = time.perf_counter() - start
+    print(f"Appended {len(history)} messages in {elapsed:.3f}s")
+    print(f"Tail read: {[m.content for m in history.get_last_messages(2)]}")
+
+    history.clear()
+    history.add_messages([HumanMessage(content="Fresh start")])
+    print(f"After clear + compaction: {len(history)} message(s), file is {os.path.getsize(path)} bytes")
+    history.close()
@@ -4,19 +4,21 @@ from langchain_core.runnables.history import RunnableWithMessageHistory
 from langchain_core.chat_history import BaseChatMessageHistory, InMemoryChatMessageHistory
 from langchain_core.messages import HumanMessage, AIMessage
 from typing import Dict, Any
+# 🔑 Keeps the last N tokens verbatim and summarizes the rest (see history_policy.py)
+from history_policy import RollingSummaryPolicy
+from session_store import BoundedSessionStore
 
 ## 🛠️ Configuration and History Setup
 
-# Type-hint the store for clarity
-store: Dict[str, InMemoryChatMessageHistory] = {}
+# 🔑 A bounded store: idle and least recently used sessions spill to disk instead of
+# staying in memory forever, and are reloaded on their next access
+store = BoundedSessionStore(max_sessions=1000, idle_ttl=3600, factory=InMemoryChatMessageHistory)
 
 def get_session_history(session_id: str) -> BaseChatMessageHistory:
     """A factory function to retrieve or create a chat history for a session."""
     if session_id not in store:
-        # 🔑 Crucial step: Instantiate the concrete history class
-        store[session_id] = InMemoryChatMessageHistory() 
         print(f"--- INFO: Created new session history for ID: {session_id}")
-    return store[session_id]
+    return store.get_or_create(session_id)
 
 # Initialize the Ollama model.
 # NOTE: Using 'mistral' as requested. Ensure it's pulled via 'ollama pull mistral'.
@@ -50,7 +52,10 @@ prompt = ChatPromptTemplate.from_messages(
 ## 3. Create the Chain with History
 
 # 1. Define the base chain (Prompt + LLM)
-base_chain = prompt | llm
+# Trim the injected history: recent turns verbatim, older turns as a running summary
+history_policy = RollingSummaryPolicy(llm, max_recent_tokens=1000)
+
+base_chain = history_policy.as_runnable() | prompt | llm
 
 # 2. Wrap the chain with history management
 # 
@@ -10,20 +10,23 @@ from langchain_core.messages import HumanMessage, AIMessage
 from langchain_ollama import ChatOllama
 # 2. The core in-memory class is imported this way in recent versions
 from langchain_community.chat_message_histories import ChatMessageHistory
+# 🔑 Keeps the last N tokens verbatim and summarizes the rest (see history_policy.py)
+from history_policy import RollingSummaryPolicy
+from session_store import BoundedSessionStore
 
 
 ## 🛠️ Configuration and History Setup
 
-# A dictionary to store history for different sessions (mimics a database)
-store: Dict[str, ChatMessageHistory] = {}
+# A bounded store for the session histories (mimics a database): it keeps at most
+# max_sessions in memory and spills idle / least recently used ones to disk
+store = BoundedSessionStore(max_sessions=1000, idle_ttl=3600, factory=ChatMessageHistory)
 
 def get_session_history(session_id: str) -> BaseChatMessageHistory:
     """A factory function to retrieve or create a chat history for a session."""
     if session_id not in store:
         # Using the CORRECTED class name found in your package structure
-        store[session_id] = ChatMessageHistory() 
         print(f"--- INFO: Created new session history for ID: {session_id}")
-    return store[session_id]
+    return store.get_or_create(session_id)
 
 # Initialize the Ollama model.
 try:
@@ -55,7 +58,10 @@ prompt = ChatPromptTemplate.from_messages(
 # 3. Create the Chain with History
 
 # 1. Define the base chain using LCEL (Prompt | LLM)
-base_chain = prompt | llm
+# Trim the injected history: recent turns verbatim, older turns as a running summary
+history_policy = RollingSummaryPolicy(llm, max_recent_tokens=1000)
+
+base_chain = history_policy.as_runnable() | prompt | llm
 
 
 # 2. Wrap the chain with history management
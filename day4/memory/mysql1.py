@@ -4,8 +4,13 @@ from langchain_core.runnables.history import RunnableWithMessageHistory
 from langchain_core.chat_history import BaseChatMessageHistory
 
 # --- Imports for SQL History ---
-from langchain_community.chat_message_histories import SQLChatMessageHistory
+# 🔑 Shares one pooled engine across sessions (see pooled_sql_history.py)
+from pooled_sql_history import PooledSQLChatMessageHistory
 from langchain_ollama import ChatOllama
+# 🔑 Keeps the last N tokens verbatim and summarizes the rest (see history_policy.py)
+from history_policy import RollingSummaryPolicy
+# 🔑 Moves history writes off the response path (see write_behind.py)
+from write_behind import WriteBehindWriter
 
 
 # --- 1. Database Configuration ---
@@ -16,25 +21,37 @@ MYSQL_HOST = "localhost"
 MYSQL_PORT = "3306"
 MYSQL_DB = "langchain_db"               # Ensure this database exists
 
-# The table name where history will be stored (LangChain manages this table)
+# The table name where history will be stored (created with a (session_id, id) index if missing)
 HISTORY_TABLE = "ollama_chat_history"
 
+# Only the most recent messages are loaded from the table on each turn
+MAX_HISTORY_MESSAGES = 50
+
 # Construct the SQLAlchemy database URL
 DB_URL = (
     f"mysql+mysqldb://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DB}"
 )
 
 
+# 🔑 New messages are buffered and INSERTed in batches by a background thread,
+# so MySQL latency is not paid before each response (flushed on exit as well)
+write_behind = WriteBehindWriter(flush_interval=0.5, max_batch=32)
+
+
 def get_session_history(session_id: str) -> BaseChatMessageHistory:
     """
-    A factory function that returns a SQLChatMessageHistory instance.
+    A factory function that returns a buffered PooledSQLChatMessageHistory instance.
     """
-    # 🔑 SQLChatMessageHistory uses the DB_URL and creates the table if it doesn't exist.
+    # 🔑 The engine for DB_URL is created once and its connection pool is reused by every call.
     # The session_id is used as a column value to filter messages for this specific conversation.
-    return SQLChatMessageHistory(
-        session_id=session_id,
-        connection_string=DB_URL,
-        table_name=HISTORY_TABLE,
+    return write_behind.history(
+        session_id,
+        lambda: PooledSQLChatMessageHistory(
+            session_id=session_id,
+            connection_string=DB_URL,
+            table_name=HISTORY_TABLE,
+            max_messages=MAX_HISTORY_MESSAGES,
+        ),
     )
 
 # Initialize the Ollama model.
@@ -63,7 +80,10 @@ prompt = ChatPromptTemplate.from_messages(
 
 # 3. Create the Chain with History
 
-base_chain = prompt | llm
+# Trim the injected history: recent turns verbatim, older turns as a running summary
+history_policy = RollingSummaryPolicy(llm, max_recent_tokens=1000)
+
+base_chain = history_policy.as_runnable() | prompt | llm
 
 chain_with_history = RunnableWithMessageHistory(
     runnable=base_chain,
@@ -93,7 +113,7 @@ if __name__ == "__main__":
     response_1 = chain_with_history.invoke(first_input, config=config)
     print(f"[ASSISTANT 1]: {response_1.content}")
     
-    print("\n--- INFO: Conversation history saved to MySQL. ---")
+    print("\n--- INFO: Conversation history queued for MySQL (written in the background). ---")
 
     # --- Turn 2: Ask a question that requires recalling the fact ---
     second_input = {"input": "What city do I live in?"}
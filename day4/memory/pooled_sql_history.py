@@ -0,0 +1,134 @@
+import json
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import BigInteger, Column, Index, Integer, MetaData, String, Table, Text, create_engine, delete, insert, select
+from sqlalchemy.engine import Engine
+
+from langchain_core.chat_history import BaseChatMessageHistory
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+
+# One engine (and therefore one connection pool) per database URL, shared by every session
+_engines: Dict[str, Engine] = {}
+_tables: Dict[Tuple[str, str], Table] = {}
+_lock = threading.Lock()
+
+
+def get_engine(db_url: str, pool_size: int = 5, max_overflow: int = 10) -> Engine:
+    """Returns the shared pooled engine for this URL, creating it on first use."""
+    with _lock:
+        if db_url not in _engines:
+            if db_url.startswith("sqlite"):
+                # SQLite picks its own pool class; the pool sizing options do not apply
+                _engines[db_url] = create_engine(db_url)
+            else:
+                _engines[db_url] = create_engine(
+                    db_url,
+                    pool_size=pool_size,
+                    max_overflow=max_overflow,
+                    pool_pre_ping=True,   # drop connections the server has closed
+                    pool_recycle=3600,    # stay under MySQL's wait_timeout
+                )
+        return _engines[db_url]
+
+
+def get_table(engine: Engine, table_name: str) -> Table:
+    """
+    Same columns as LangChain's SQLChatMessageHistory (id, session_id, message), so an
+    existing history table keeps working, plus an index on (session_id, id) so a
+    session's latest messages are found without scanning the table. The index is
+    created separately, so tables created earlier by SQLChatMessageHistory get it too.
+    """
+    key = (str(engine.url), table_name)
+    with _lock:
+        if key not in _tables:
+            table = Table(
+                table_name,
+                MetaData(),
+                # SQLite only auto-increments a plain INTEGER primary key
+                Column("id", BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True),
+                Column("session_id", String(255), nullable=False),
+                Column("message", Text, nullable=False),
+            )
+            table.create(engine, checkfirst=True)
+            # LangChain creates session_id as TEXT, which MySQL only indexes with a prefix length
+            Index(
+                f"ix_{table_name}_session_id_id", table.c.session_id, table.c.id,
+                mysql_length={"session_id": 191},
+            ).create(engine, checkfirst=True)
+            _tables[key] = table
+        return _tables[key]
+
+
+class PooledSQLChatMessageHistory(BaseChatMessageHistory):
+    """
+    SQL-backed chat history that reuses one pooled engine across sessions instead of
+    building a new engine and connection for every SQLChatMessageHistory instance.
+
+    Only the last `max_messages` messages are loaded (ORDER BY id DESC LIMIT n), and
+    add_messages writes the whole turn in a single batched INSERT.
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        connection_string: str,
+        table_name: str = "message_store",
+        max_messages: Optional[int] = None,
+    ):
+        self.session_id = session_id
+        self.max_messages = max_messages
+        self.engine = get_engine(connection_string)
+        self.table = get_table(self.engine, table_name)
+
+    @property
+    def messages(self) -> List[BaseMessage]:
+        return self.get_last_messages(self.max_messages)
+
+    def get_last_messages(self, n: Optional[int]) -> List[BaseMessage]:
+        query = (
+            select(self.table.c.message)
+            .where(self.table.c.session_id == self.session_id)
+            .order_by(self.table.c.id.desc())
+        )
+        if n is not None:
+            query = query.limit(n)
+        with self.engine.connect() as conn:
+            rows = conn.execute(query).scalars().all()
+        # Newest first from the query; the chat wants oldest first
+        return messages_from_dict([json.loads(r) for r in reversed(rows)])
+
+    def add_messages(self, messages: Sequence[BaseMessage]) -> None:
+        if not messages:
+            return
+        rows = [
+            {"session_id": self.session_id, "message": json.dumps(message_to_dict(m))}
+            for m in messages
+        ]
+        with self.engine.begin() as conn:
+            conn.execute(insert(self.table), rows)
+
+    def clear(self) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(delete(self.table).where(self.table.c.session_id == self.session_id))
+
+
+if __name__ == "__main__":
+    import time
+    from langchain_core.messages import AIMessage, HumanMessage
+
+    # SQLite stands in for MySQL here; pass the mysql+mysqldb:// URL in production
+    db_url = "sqlite:///pooled_history_demo.db"
+
+    start = time.perf_counter()
+    for turn in range(200):
+        history = PooledSQLChatMessageHistory(f"session-{turn % 10}", db_url, "ollama_chat_history", max_messages=20)
+        history.messages
+        history.add_messages([HumanMessage(content=f"Question {turn}"), AIMessage(content=f"Answer {turn}")])
+    elapsed = time.perf_counter() - start
+    print(f"200 turns across 10 sessions in {elapsed:.3f}s ({elapsed / 200 * 1000:.2f} ms/turn)")
+
+    history = PooledSQLChatMessageHistory("session-3", db_url, "ollama_chat_history", max_messages=4)
+    print(f"Last 4 messages of session-3: {[m.content for m in history.messages]}")
+    for i in range(10):
+        PooledSQLChatMessageHistory(f"session-{i}", db_url, "ollama_chat_history").clear()
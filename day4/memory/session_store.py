@@ -0,0 +1,185 @@
+import json
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Callable, List, Optional, Sequence
+from urllib.parse import quote
+
+from langchain_core.chat_history import BaseChatMessageHistory, InMemoryChatMessageHistory
+from langchain_core.messages import BaseMessage, messages_from_dict, messages_to_dict
+
+
+class _StoredHistory(BaseChatMessageHistory):
+    """
+    The history handed out by BoundedSessionStore. A caller may still hold it after the
+    session is evicted (e.g. mid-invoke), so writes made then go straight to the spill file.
+    """
+
+    def __init__(self, store: "BoundedSessionStore", session_id: str, inner: BaseChatMessageHistory):
+        self.store = store
+        self.session_id = session_id
+        self.inner = inner
+
+    @property
+    def messages(self) -> List[BaseMessage]:
+        return self.inner.messages
+
+    def add_messages(self, messages: Sequence[BaseMessage]) -> None:
+        self.inner.add_messages(messages)
+        self.store._written(self)
+
+    def clear(self) -> None:
+        self.inner.clear()
+        self.store._written(self)
+
+
+class BoundedSessionStore:
+    """
+    A drop-in replacement for the `store: Dict[str, InMemoryChatMessageHistory]` pattern
+    that does not grow forever.
+
+    At most `max_sessions` histories (and roughly `max_bytes` of message text) stay in
+    memory. The least recently used ones, and any idle for longer than `idle_ttl`
+    seconds, are spilled to a JSON file in `spill_dir` and lazily reloaded on the next
+    access to that session. A reloaded session's file is removed, so the files on disk
+    are exactly the sessions not held in memory.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 1000,
+        max_bytes: Optional[int] = None,
+        idle_ttl: Optional[float] = 3600.0,
+        spill_dir: str = "spilled_sessions",
+        factory: Callable[[], BaseChatMessageHistory] = InMemoryChatMessageHistory,
+    ):
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.idle_ttl = idle_ttl
+        self.spill_dir = spill_dir
+        self.factory = factory
+        os.makedirs(spill_dir, exist_ok=True)
+
+        self._lock = threading.RLock()
+        # session_id -> (history, last access time, approx. size in bytes), oldest first
+        self._resident: "OrderedDict[str, list]" = OrderedDict()
+        self._resident_bytes = 0
+        # Evicted histories that a caller may still hold (e.g. mid-invoke); reused on reload
+        self._evicted = weakref.WeakValueDictionary()
+
+    # --- Dict-like API used by the examples ---
+
+    def __getitem__(self, session_id: str) -> BaseChatMessageHistory:
+        history = self.get(session_id)
+        if history is None:
+            raise KeyError(session_id)
+        return history
+
+    def __contains__(self, session_id: str) -> bool:
+        with self._lock:
+            return session_id in self._resident or os.path.exists(self._spill_path(session_id))
+
+    def __len__(self) -> int:
+        """Number of sessions currently held in memory."""
+        return len(self._resident)
+
+    def get(self, session_id: str, create: bool = False) -> Optional[BaseChatMessageHistory]:
+        with self._lock:
+            now = time.monotonic()
+            entry = self._resident.get(session_id)
+            if entry is None:
+                history = self._reload(session_id)
+                if history is None:
+                    if not create:
+                        return None
+                    history = _StoredHistory(self, session_id, self.factory())
+                entry = self._resident[session_id] = [history, now, 0]
+            self._resident.move_to_end(session_id)
+
+            # Messages are added after the history is handed out, so the size is
+            # refreshed on each access and reflects the session up to its last turn
+            size = self._size(entry[0])
+            self._resident_bytes += size - entry[2]
+            entry[1], entry[2] = now, size
+
+            self._enforce_limits(now, keep=session_id)
+            return entry[0]
+
+    def get_or_create(self, session_id: str) -> BaseChatMessageHistory:
+        return self.get(session_id, create=True)
+
+    def flush(self):
+        """Spills every resident session, e.g. on graceful shutdown."""
+        with self._lock:
+            for session_id in list(self._resident):
+                self._evict(session_id)
+
+    # --- Internals ---
+
+    def _spill_path(self, session_id: str) -> str:
+        return os.path.join(self.spill_dir, quote(session_id, safe="") + ".json")
+
+    @staticmethod
+    def _size(history: BaseChatMessageHistory) -> int:
+        return sum(len(str(m.content)) for m in history.messages)
+
+    def _enforce_limits(self, now: float, keep: str):
+        for session_id in list(self._resident):
+            over_count = len(self._resident) > self.max_sessions
+            over_bytes = self.max_bytes is not None and self._resident_bytes > self.max_bytes
+            idle = self.idle_ttl is not None and now - self._resident[session_id][1] > self.idle_ttl
+            if session_id == keep:
+                continue
+            if over_count or over_bytes or idle:
+                self._evict(session_id)
+            else:
+                # Entries are ordered by last access, so the rest are newer and within budget
+                break
+
+    def _spill(self, session_id: str, history: BaseChatMessageHistory):
+        tmp_path = self._spill_path(session_id) + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(messages_to_dict(history.messages), f)
+        os.replace(tmp_path, self._spill_path(session_id))
+
+    def _evict(self, session_id: str):
+        history, _, size = self._resident.pop(session_id)
+        self._resident_bytes -= size
+        self._spill(session_id, history)
+        self._evicted[session_id] = history
+
+    def _written(self, history: _StoredHistory):
+        """Called after every write; keeps the spill file current for evicted sessions."""
+        with self._lock:
+            if history.session_id not in self._resident:
+                self._spill(history.session_id, history)
+
+    def _reload(self, session_id: str) -> Optional[BaseChatMessageHistory]:
+        path = self._spill_path(session_id)
+        # A caller still holding the evicted history keeps it alive; reuse that object
+        history = self._evicted.pop(session_id, None)
+        if history is None:
+            if not os.path.exists(path):
+                return None
+            with open(path, encoding="utf-8") as f:
+                messages = messages_from_dict(json.load(f))
+            history = _StoredHistory(self, session_id, self.factory())
+            history.inner.add_messages(messages)
+        # Resident again: memory is the source of truth until the next eviction
+        if os.path.exists(path):
+            os.remove(path)
+        return history
+
+
+if __name__ == "__main__":
+    from langchain_core.messages import AIMessage, HumanMessage
+
+    store = BoundedSessionStore(max_sessions=3, idle_ttl=None, spill_dir="spilled_sessions_demo")
+    for i in range(10):
+        store.get_or_create(f"user-{i}").add_messages(
+            [HumanMessage(content=f"Hi, I am user {i}"), AIMessage(content="Hello!")]
+        )
+    print(f"Sessions resident in memory: {len(store)} (of 10 created)")
+    print(f"Reloaded from disk: {store['user-0'].messages[0].content}")
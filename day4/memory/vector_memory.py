@@ -0,0 +1,170 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, List, Optional, Sequence
+
+from langchain_core.chat_history import BaseChatMessageHistory, InMemoryChatMessageHistory
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+from langchain_core.runnables import RunnableLambda, RunnablePassthrough
+from langchain_core.vectorstores import InMemoryVectorStore
+
+
+class _RecallHistory(BaseChatMessageHistory):
+    """
+    Per-session history handed to RunnableWithMessageHistory. Messages are stored in a
+    durable backend history; reading returns only the recent window. Every completed
+    turn is also embedded into the session's vector index, which is rebuilt from the
+    backend when the session is loaded (e.g. after a restart).
+    """
+
+    def __init__(self, backend: BaseChatMessageHistory, embeddings: Embeddings, recent_messages: int):
+        self.backend = backend
+        self.recent_messages = recent_messages
+        self.index = InMemoryVectorStore(embeddings)
+        self.turns = 0
+        self._pending_human = None
+        self._lock = threading.Lock()
+        self._index_turns(self.backend.messages)
+
+    @property
+    def messages(self) -> List[BaseMessage]:
+        if hasattr(self.backend, "get_last_messages"):
+            return self.backend.get_last_messages(self.recent_messages)
+        return list(self.backend.messages[-self.recent_messages:])
+
+    def add_messages(self, messages: Sequence[BaseMessage]) -> None:
+        self.backend.add_messages(messages)
+        self._index_turns(messages)
+
+    def _index_turns(self, messages: Sequence[BaseMessage]):
+        texts, metadatas = [], []
+        with self._lock:
+            for message in messages:
+                if isinstance(message, HumanMessage):
+                    self._pending_human = message
+                elif isinstance(message, AIMessage) and self._pending_human is not None:
+                    texts.append(f"User: {self._pending_human.content}\nAssistant: {message.content}")
+                    metadatas.append({"turn": self.turns})
+                    self.turns += 1
+                    self._pending_human = None
+        if texts:
+            # One embedding call for the whole batch of completed turns
+            self.index.add_texts(texts, metadatas=metadatas)
+
+    def clear(self) -> None:
+        self.backend.clear()
+        with self._lock:
+            self.index = InMemoryVectorStore(self.index.embedding)
+            self.turns = 0
+            self._pending_human = None
+
+
+class VectorRecallMemory:
+    """
+    Long-term memory that recalls relevant past turns instead of replaying everything.
+
+    Each session's messages live in a durable history from `history_factory(session_id)`
+    (JSONL file, SQL, ...). Only the last `recent_messages` are sent verbatim; on each
+    new input the `k` past turns most similar to it are recalled from a vector index, so
+    the prompt stays the same size however long the session runs. At most
+    `max_sessions` indexes are kept in memory; an evicted session's index is rebuilt
+    from its history on the next access.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        k: int = 3,
+        recent_messages: int = 6,
+        min_score: float = 0.0,
+        history_factory: Optional[Callable[[str], BaseChatMessageHistory]] = None,
+        max_sessions: int = 100,
+    ):
+        self.embeddings = embeddings
+        self.k = k
+        self.recent_messages = recent_messages
+        self.min_score = min_score
+        self.history_factory = history_factory or (lambda session_id: InMemoryChatMessageHistory())
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, _RecallHistory]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_session_history(self, session_id: str) -> BaseChatMessageHistory:
+        """Pass this as `get_session_history` to RunnableWithMessageHistory."""
+        with self._lock:
+            if session_id not in self._sessions:
+                self._sessions[session_id] = _RecallHistory(
+                    self.history_factory(session_id), self.embeddings, self.recent_messages
+                )
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)  # least recently used
+            self._sessions.move_to_end(session_id)
+            return self._sessions[session_id]
+
+    def recall(self, session_id: str, query: str) -> List[str]:
+        """Returns the top-k past turns relevant to `query`, oldest first."""
+        history = self.get_session_history(session_id)
+        # Turns still inside the recent window are already in the prompt verbatim
+        first_recent_turn = history.turns - self.recent_messages // 2
+        if first_recent_turn <= 0:
+            return []
+        hits = history.index.similarity_search_with_score(
+            query,
+            k=self.k,
+            filter=lambda doc: doc.metadata["turn"] < first_recent_turn,
+        )
+        hits = [doc for doc, score in hits if score >= self.min_score]
+        return [doc.page_content for doc in sorted(hits, key=lambda d: d.metadata["turn"])]
+
+    def as_runnable(self, history_key: str = "history", input_key: str = "input"):
+        """A step to put in front of the prompt: `memory.as_runnable() | prompt | llm`."""
+        def _inject(inputs, config):
+            session_id = config["configurable"]["session_id"]
+            recalled = self.recall(session_id, inputs[input_key])
+            if not recalled:
+                return inputs[history_key]
+            header = SystemMessage(content="Relevant earlier conversation:\n\n" + "\n\n".join(recalled))
+            return [header] + list(inputs[history_key])
+
+        return RunnablePassthrough.assign(**{history_key: RunnableLambda(_inject)})
+
+
+if __name__ == "__main__":
+    from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+    from langchain_core.runnables.history import RunnableWithMessageHistory
+    from langchain_ollama import ChatOllama, OllamaEmbeddings
+    from jsonl_history import JSONLChatMessageHistory
+
+    llm = ChatOllama(model="mistral", temperature=0.0)
+    # Messages are kept in JSONL files, so the recall index survives a restart
+    memory = VectorRecallMemory(
+        OllamaEmbeddings(model="nomic-embed-text"), k=2, recent_messages=4,
+        history_factory=lambda session_id: JSONLChatMessageHistory(f"chat_histories/{session_id}.jsonl"),
+    )
+
+    prompt = ChatPromptTemplate.from_messages(
+        [
+            ("system", "You are a helpful and friendly assistant. Keep your answers concise."),
+            MessagesPlaceholder(variable_name="history"),
+            ("human", "{input}"),
+        ]
+    )
+    chain_with_history = RunnableWithMessageHistory(
+        runnable=memory.as_runnable() | prompt | llm,
+        get_session_history=memory.get_session_history,
+        input_messages_key="input",
+        history_messages_key="history",
+    )
+
+    config = {"configurable": {"session_id": "long-term-demo"}}
+    turns = [
+        "My cat's name is Mittens.",
+        "What is the tallest mountain on Earth?",
+        "Give me a quick pasta recipe.",
+        "How long should I boil the pasta?",
+        "What was my cat's name again?",
+    ]
+    for i, text in enumerate(turns, 1):
+        print(f"\n[USER {i}]: {text}")
+        response = chain_with_history.invoke({"input": text}, config=config)
+        print(f"[ASSISTANT {i}]: {response.content}")
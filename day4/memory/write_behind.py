@@ -0,0 +1,207 @@
+import atexit
+import threading
+import time
+import weakref
+from typing import Callable, Dict, List, Optional, Sequence
+
+from langchain_core.chat_history import BaseChatMessageHistory
+from langchain_core.messages import BaseMessage
+
+
+class WriteBehindHistory(BaseChatMessageHistory):
+    """
+    Wraps a slow history backend (file, MySQL, ...) so add_messages only appends to an
+    in-memory buffer and returns. The WriteBehindWriter flushes the buffer to the
+    backend in batches. The backend is read once; after that reads come from an
+    in-memory copy, so a turn never waits for a flush that is in progress.
+
+    The copy keeps the same window as the backend: with a backend that loads only its
+    last `max_messages` (e.g. PooledSQLChatMessageHistory), so does `messages` here.
+    """
+
+    def __init__(self, session_id: str, backend: BaseChatMessageHistory, writer: "WriteBehindWriter"):
+        self.session_id = session_id
+        self.backend = backend
+        self.writer = writer
+        self._buffer: List[BaseMessage] = []
+        self._inflight: List[BaseMessage] = []   # popped from the buffer, not yet written
+        self._loaded: Optional[List[BaseMessage]] = None  # backend messages + everything added since
+        self.max_messages: Optional[int] = getattr(backend, "max_messages", None)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()      # keeps batches in order
+        self.last_used = time.monotonic()
+
+    @property
+    def messages(self) -> List[BaseMessage]:
+        self.last_used = time.monotonic()
+        with self._lock:
+            if self._loaded is not None:
+                return list(self._loaded)
+        # First read only: the backend and the pending batches must be read together
+        with self._flush_lock:
+            stored = list(self.backend.messages)
+            with self._lock:
+                if self._loaded is None:
+                    self._loaded = stored + self._inflight + self._buffer
+                    self._trim()
+                return list(self._loaded)
+
+    def _trim(self) -> None:
+        # Caller holds self._lock
+        if self.max_messages is not None and len(self._loaded) > self.max_messages:
+            del self._loaded[:-self.max_messages]
+
+    @property
+    def is_clean(self) -> bool:
+        with self._lock:
+            return not self._buffer and not self._inflight
+
+    def add_messages(self, messages: Sequence[BaseMessage]) -> None:
+        self.last_used = time.monotonic()
+        with self._lock:
+            self._buffer.extend(messages)
+            if self._loaded is not None:
+                self._loaded.extend(messages)
+                self._trim()
+            pending = len(self._buffer)
+        self.writer.mark_dirty(self, pending)
+
+    def clear(self) -> None:
+        with self._flush_lock:
+            with self._lock:
+                self._buffer = []
+                self._loaded = []
+            self.backend.clear()
+
+    def flush(self) -> None:
+        """Writes everything buffered to the backend, then flushes the backend itself."""
+        self._write_batch()
+        if hasattr(self.backend, "flush"):
+            self.backend.flush()
+
+    def _write_batch(self) -> bool:
+        with self._flush_lock:
+            with self._lock:
+                if not self._buffer:
+                    return True
+                self._inflight, self._buffer = self._buffer, []
+            try:
+                self.backend.add_messages(self._inflight)
+            except Exception as e:
+                print(f"⚠️ Write-behind flush failed, will retry: {e}")
+                with self._lock:
+                    self._buffer = self._inflight + self._buffer
+                return False
+            finally:
+                with self._lock:
+                    self._inflight = []
+            return True
+
+
+class WriteBehindWriter:
+    """
+    Background thread that flushes dirty WriteBehindHistory buffers every
+    `flush_interval` seconds, or sooner once a buffer holds `max_batch` messages.
+    Everything still buffered is flushed on close() and at interpreter exit.
+
+    Sessions that are fully flushed and unused for `idle_ttl` seconds are dropped; their
+    backend is closed once no caller holds the history any more.
+    """
+
+    def __init__(self, flush_interval: float = 0.5, max_batch: int = 32, idle_ttl: Optional[float] = 600.0):
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.idle_ttl = idle_ttl
+        self._histories: Dict[str, WriteBehindHistory] = {}
+        # Dropped histories a caller may still hold; reused so a session never has two buffers
+        self._idle = weakref.WeakValueDictionary()
+        self._dirty = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def history(self, session_id: str, backend_factory: Callable[[], BaseChatMessageHistory]) -> WriteBehindHistory:
+        """Returns the buffered history for a session, so every caller sees the same buffer."""
+        with self._lock:
+            if session_id not in self._histories:
+                history = self._idle.pop(session_id, None)
+                if history is None:
+                    history = WriteBehindHistory(session_id, backend_factory(), self)
+                    if hasattr(history.backend, "close"):
+                        weakref.finalize(history, history.backend.close)
+                self._histories[session_id] = history
+            return self._histories[session_id]
+
+    def mark_dirty(self, history: WriteBehindHistory, pending: int):
+        with self._lock:
+            self._dirty.add(history)
+            # A caller may write to a history that was dropped as idle; take it back
+            if self._histories.setdefault(history.session_id, history) is history:
+                self._idle.pop(history.session_id, None)
+        if pending >= self.max_batch:
+            self._wake.set()
+
+    def flush(self):
+        """Synchronously flushes every dirty history."""
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+        for history in dirty:
+            if not history._write_batch():
+                with self._lock:
+                    self._dirty.add(history)
+
+    def evict_idle(self):
+        """Drops sessions with nothing pending that have not been used for idle_ttl seconds."""
+        if self.idle_ttl is None:
+            return
+        cutoff = time.monotonic() - self.idle_ttl
+        with self._lock:
+            for session_id, history in list(self._histories.items()):
+                if history.last_used < cutoff and history not in self._dirty and history.is_clean:
+                    del self._histories[session_id]
+                    self._idle[session_id] = history
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+            self.evict_idle()
+
+    def close(self):
+        """Stops the background thread and makes every buffered message durable."""
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._thread.join()
+        self.flush()
+        for history in list(self._histories.values()):
+            history.flush()
+
+
+if __name__ == "__main__":
+    import time
+    from langchain_core.chat_history import InMemoryChatMessageHistory
+    from langchain_core.messages import AIMessage, HumanMessage
+
+    class SlowHistory(InMemoryChatMessageHistory):
+        """Stands in for a backend with ~20 ms write latency."""
+        def add_messages(self, messages):
+            time.sleep(0.02)
+            super().add_messages(messages)
+
+    writer = WriteBehindWriter(flush_interval=0.2, max_batch=16)
+    history = writer.history("demo", SlowHistory)
+
+    start = time.perf_counter()
+    for i in range(50):
+        history.add_messages([HumanMessage(content=f"Question {i}"), AIMessage(content=f"Answer {i}")])
+    print(f"50 turns recorded in {(time.perf_counter() - start) * 1000:.1f} ms on the response path")
+    print(f"Visible immediately (buffered + stored): {len(history.messages)} messages")
+
+    writer.close()
+    print(f"Durable in the backend after close(): {len(history.backend.messages)} messages")
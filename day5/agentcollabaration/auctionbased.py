@@ -1,16 +1,21 @@
+import asyncio
 import random
 import time
-from typing import Dict, Any, List
+from typing import Callable, Dict, Any, List
 from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_ollama import ChatOllama
 from langgraph.graph import StateGraph, END
 from typing import TypedDict, Annotated, List, Union
 import operator
 import json
+import weakref
 # --- 1. Ollama Configuration ---
 # NOTE: In a real system, the Manager would use the LLM to judge bids.
 # For simplicity, we define the LLM here but primarily use Python logic.
-ollama_llm_judge = ChatOllama(model="llama3:latest", base_url="http://127.0.0.1:11434")
+def make_judge_llm():
+    # ChatOllama's async client is bound to the event loop it first runs on, so the
+    # manager builds one per loop instead of sharing a module-level instance
+    return ChatOllama(model="llama3:latest", base_url="http://127.0.0.1:11434")
 
 class AgentBidder:
     """Represents a specialized worker agent that bids on tasks."""
@@ -39,31 +44,57 @@ class AgentBidder:
             "estimated_time_h": estimated_time
         }
 
+    async def abid(self, task_description: str) -> Dict[str, Any]:
+        """Async bid, so the manager can collect every bid at the same time."""
+        # bid() is cheap here, but a real bidder may call a model or a remote service
+        return await asyncio.to_thread(self.bid, task_description)
+
     def execute_task(self, task_description: str) -> str:
         """Simulates task execution."""
         time.sleep(1) # Simulate work time
         return f"Task executed by {self.name} ({self.specialization}). Result: {task_description[:30]}..."
 
+    async def aexecute_task(self, task_description: str) -> str:
+        """Simulates task execution without blocking other auctions."""
+        await asyncio.sleep(1) # Simulate work time
+        return f"Task executed by {self.name} ({self.specialization}). Result: {task_description[:30]}..."
+
+# Default trade-off between the bid fields; scores are in [0, 1], higher is better
+DEFAULT_WEIGHTS = {"competence": 0.6, "cost": 0.25, "time": 0.15}
+
+def weighted_score(bid: Dict[str, Any], all_bids: List[Dict[str, Any]], weights: Dict[str, float] = DEFAULT_WEIGHTS) -> float:
+    """Competence counts as-is; cost and time are scored relative to the cheapest/fastest bid."""
+    cheapest = min(b["cost"] for b in all_bids)
+    fastest = min(b["estimated_time_h"] for b in all_bids)
+    return (
+        weights["competence"] * bid["competence_score"]
+        + weights["cost"] * (cheapest / bid["cost"] if bid["cost"] else 1.0)
+        + weights["time"] * (fastest / bid["estimated_time_h"] if bid["estimated_time_h"] else 1.0)
+    )
+
 class AuctionManager:
-    """Manages the bidding process and awards the contract using LLM judgment."""
-    def __init__(self, bidders: List[AgentBidder], llm=ollama_llm_judge):
+    """
+    Manages the bidding process and awards the contract. Bids are ranked with a numeric
+    scoring function; the LLM judge is only consulted when the top bids are near-tied.
+    """
+    def __init__(self, bidders: List[AgentBidder], llm_factory: Callable[[], Any] = make_judge_llm,
+                 scoring_fn: Callable[[Dict[str, Any], List[Dict[str, Any]]], float] = weighted_score,
+                 tie_margin: float = 0.05):
         self.bidders = bidders
-        self.llm = llm
+        self.llm_factory = llm_factory
+        self.scoring_fn = scoring_fn
+        self.tie_margin = tie_margin
+        self._llms = weakref.WeakKeyDictionary()  # event loop -> judge LLM
 
-    def conduct_auction(self, task_description: str) -> str:
-        """
-        1. Broadcasts the task.
-        2. Collects bids.
-        3. Uses LLM to judge the best bid.
-        4. Awards contract to the best bidder.
-        """
-        print(f"💰 Manager: Broadcasting task: '{task_description}'")
-        
-        # 1. Collect bids
-        all_bids = [bidder.bid(task_description) for bidder in self.bidders]
-        
-        # 2. LLM Judgment (The core of the delegation)
-        bids_str = json.dumps(all_bids, indent=2)
+    def judge_llm(self):
+        loop = asyncio.get_running_loop()
+        if loop not in self._llms:
+            self._llms[loop] = self.llm_factory()
+        return self._llms[loop]
+
+    async def judge_with_llm(self, task_description: str, bids: List[Dict[str, Any]]) -> Union[str, None]:
+        """Asks Ollama to break a near-tie between the given bids."""
+        bids_str = json.dumps(bids, indent=2)
         
         # The Manager uses Ollama to decide the winner based on trade-offs (Cost vs. Competence)
         judge_prompt = f"""
@@ -74,20 +105,54 @@ class AuctionManager:
         Based on the data, identify the BEST agent. Output ONLY the name of the winning agent.
         """
         
-        print("\n🧠 Manager: Asking Ollama to judge the best bid...")
+        print("\n🧠 Manager: Near-tie, asking Ollama to judge the best bid...")
         
-        llm_response = self.llm.invoke([SystemMessage(content=judge_prompt)]).content.strip()
+        try:
+            llm_response = (await self.judge_llm().ainvoke([SystemMessage(content=judge_prompt)])).content.strip()
+        except Exception as e:
+            print(f"⚠️ Manager: LLM judge unavailable ({e}).")
+            return None
         winning_agent_name = llm_response.split('\n')[0].strip().replace('.', '')
+        return next((b["agent_name"] for b in bids if b["agent_name"] == winning_agent_name), None)
+
+    async def aconduct_auction(self, task_description: str) -> str:
+        """
+        1. Broadcasts the task.
+        2. Collects bids concurrently.
+        3. Scores the bids; only near-ties go to the LLM judge.
+        4. Awards contract to the best bidder.
+        """
+        print(f"💰 Manager: Broadcasting task: '{task_description}'")
         
-        # 3. Award Contract
-        winner = next((b for b in self.bidders if b.name == winning_agent_name), None)
+        # 1. Collect bids
+        all_bids = await asyncio.gather(*(bidder.abid(task_description) for bidder in self.bidders))
+        if not all_bids:
+            return "Manager failed to award contract. No bids were received."
 
-        if winner:
-            print(f"\n🎉 Manager: Contract awarded to {winner.name}!")
-            # 4. Execution
-            return winner.execute_task(task_description)
+        # 2. Numeric scoring fast path
+        ranked = sorted(all_bids, key=lambda b: self.scoring_fn(b, all_bids), reverse=True)
+        top_score = self.scoring_fn(ranked[0], all_bids)
+        contenders = [b for b in ranked if top_score - self.scoring_fn(b, all_bids) <= self.tie_margin]
+
+        winning_agent_name = ranked[0]["agent_name"]
+        if len(contenders) > 1:
+            # 3. LLM Judgment, only for the bids that are too close to call numerically
+            judged = await self.judge_with_llm(task_description, contenders)
+            if judged:
+                winning_agent_name = judged
+            else:
+                print("⚠️ Manager: No usable LLM verdict, keeping the top numeric score.")
         else:
-            return f"Manager failed to award contract. LLM response was unclear: {llm_response}"
+            print(f"\n📊 Manager: Clear winner by score ({top_score:.2f}), no LLM call needed.")
+        
+        # 4. Award Contract
+        winner = next(b for b in self.bidders if b.name == winning_agent_name)
+        print(f"\n🎉 Manager: Contract awarded to {winner.name}!")
+        # 5. Execution
+        return await winner.aexecute_task(task_description)
+
+    def conduct_auction(self, task_description: str) -> str:
+        return asyncio.run(self.aconduct_auction(task_description))
 
 # --- Example Use Case: Automated Research Delegation ---
 research_bidders = [
@@ -96,7 +161,26 @@ research_bidders = [
     AgentBidder("General Assistant", "general knowledge, summarize", 50.0),
 ]
 
-manager = AuctionManager(research_bidders)
-task = "Find the latest news on AI stock performance and summarize its impact."
-final_report = manager.conduct_auction(task)
-print(f"\n--- Auction Delegation Final Result ---\n{final_report}")
\ No newline at end of file
+async def run_many_auctions(manager: AuctionManager, tasks: List[str]) -> List[str]:
+    """Many auctions can run at once because bidding, judging and execution are all async."""
+    return await asyncio.gather(*(manager.aconduct_auction(t) for t in tasks))
+
+async def main():
+    # One event loop for the whole demo
+    manager = AuctionManager(research_bidders)
+    task = "Find the latest news on AI stock performance and summarize its impact."
+    final_report = await manager.aconduct_auction(task)
+    print(f"\n--- Auction Delegation Final Result ---\n{final_report}")
+
+    started = time.perf_counter()
+    reports = await run_many_auctions(manager, [
+        "Summarize today's general knowledge quiz answers.",
+        "Review the machine learning pipeline for bugs.",
+        "Assess the investment risk of our stock market portfolio.",
+    ])
+    print(f"\n--- {len(reports)} concurrent auctions finished in {time.perf_counter() - started:.1f}s ---")
+    for report in reports:
+        print(report)
+
+if __name__ == "__main__":
+    asyncio.run(main())
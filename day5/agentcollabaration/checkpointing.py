@@ -0,0 +1,90 @@
+# pip install langgraph-checkpoint-sqlite aiosqlite
+"""
+Durable state for the LangGraph workflows in this folder.
+
+- A SQLite checkpointer saves the graph state after every node, per thread ID, so a run
+  that crashes (e.g. in iteration 3 of the writer/critic loop) resumes from the last
+  finished node instead of starting over.
+- A SQLite node cache memoizes node outputs by their input, so a retry with the same
+  state skips LLM calls that already completed.
+
+Usage:
+    app = workflow.compile(checkpointer=get_checkpointer(), cache=get_node_cache())
+    final_state = run_or_resume(app, inputs, thread_id="report-42")
+
+Each finished run keeps its own thread, so repeated runs with the same ID do not share state.
+"""
+import sqlite3
+from contextlib import asynccontextmanager
+
+from langgraph.cache.sqlite import SqliteCache
+from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.types import CachePolicy
+
+CHECKPOINT_DB = "langgraph_checkpoints.sqlite"
+NODE_CACHE_DB = "langgraph_node_cache.sqlite"
+
+# Pass as add_node(..., cache_policy=NODE_CACHE_POLICY) for nodes worth memoizing
+NODE_CACHE_POLICY = CachePolicy(ttl=24 * 3600)
+
+def get_checkpointer(path: str = CHECKPOINT_DB) -> SqliteSaver:
+    """Checkpointer for graphs run with app.invoke()."""
+    return SqliteSaver(sqlite3.connect(path, check_same_thread=False))
+
+@asynccontextmanager
+async def async_checkpointer(path: str = CHECKPOINT_DB):
+    """Checkpointer for graphs run with app.ainvoke(); SqliteSaver is sync-only."""
+    from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+    async with AsyncSqliteSaver.from_conn_string(path) as saver:
+        yield saver
+
+def get_node_cache(path: str = NODE_CACHE_DB) -> SqliteCache:
+    return SqliteCache(path=path)
+
+def thread_config(thread_id: str) -> dict:
+    return {"configurable": {"thread_id": thread_id}}
+
+def run_or_resume(app, inputs: dict, thread_id: str) -> dict:
+    """
+    Resumes the thread from its last checkpoint if it stopped part-way on the same inputs.
+    A thread that already finished, or that stopped on other inputs, is never re-invoked
+    with these ones (they would merge into its state); the run goes to the next free
+    thread ID instead: "<id>#1", "<id>#2", ...
+    """
+    for run_id in _run_ids(thread_id):
+        config = thread_config(run_id)
+        snapshot = app.get_state(config)
+        if snapshot.next:
+            if _started_with(app.get_state_history(config), inputs, run_id):
+                print(f"♻️ Resuming thread '{run_id}' before node(s) {list(snapshot.next)}")
+                return app.invoke(None, config)
+        elif not snapshot.values:
+            return app.invoke(inputs, config)
+
+async def arun_or_resume(app, inputs: dict, thread_id: str) -> dict:
+    for run_id in _run_ids(thread_id):
+        config = thread_config(run_id)
+        snapshot = await app.aget_state(config)
+        if snapshot.next:
+            history = [s async for s in app.aget_state_history(config)]
+            if _started_with(history, inputs, run_id):
+                print(f"♻️ Resuming thread '{run_id}' before node(s) {list(snapshot.next)}")
+                return await app.ainvoke(None, config)
+        elif not snapshot.values:
+            return await app.ainvoke(inputs, config)
+
+def _started_with(history, inputs: dict, run_id: str) -> bool:
+    """True if the thread's first step saw the same values for every key in `inputs`."""
+    # History is newest first; step 0 is the state right after the inputs were applied
+    first = next((s for s in reversed(list(history)) if (s.metadata or {}).get("step") == 0), None)
+    if first is None or all(first.values.get(key) == value for key, value in inputs.items()):
+        return True
+    print(f"⚠️ Thread '{run_id}' stopped part-way on different inputs; leaving it and starting a new run")
+    return False
+
+def _run_ids(thread_id: str):
+    yield thread_id
+    n = 1
+    while True:
+        yield f"{thread_id}#{n}"
+        n += 1
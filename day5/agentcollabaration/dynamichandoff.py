@@ -2,49 +2,72 @@
 from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_ollama import ChatOllama
 from langgraph.graph import StateGraph, END
-from typing import TypedDict, Annotated, List, Union
+from typing import TypedDict, Annotated, Callable, Dict, List, Optional, Union
+from contextvars import ContextVar
+import asyncio
 import operator
-import json
+import time
+# Durable SQLite checkpoints + memoized node outputs (see checkpointing.py)
+from checkpointing import NODE_CACHE_POLICY, arun_or_resume, async_checkpointer, get_node_cache
+from label_classifier import aclassify_label
 
 # --- 1. Ollama Configuration (Use your validated settings) ---
 ollama_llm = ChatOllama(model="llama3:latest", base_url="http://127.0.0.1:11434")
+# The router only needs a label, so it calls Ollama directly with constrained output
+# (aclassify_label keeps one AsyncClient per event loop for this host)
+ROUTER_TOPICS = ["MATH", "GENERAL"]
+
+# Opt-in: start the likely branches while the router is still classifying
+SPECULATIVE = False
+
+# Counts streamed chunks (~tokens) for the branch running in the current asyncio task
+token_counter: ContextVar[Optional[List[int]]] = ContextVar("token_counter", default=None)
 
 # --- 2. Define State ---
-class HandoffState(TypedDict):
+class HandoffState(TypedDict, total=False):
     request: str
     topic: str
     response: str
+    # Outputs of branches that already ran speculatively, keyed by node name
+    speculative: Dict[str, dict]
+
+async def generate(messages) -> str:
+    """Streams a reply so partial work can be counted, and cancelled mid-generation."""
+    counter = token_counter.get()
+    parts = []
+    async for chunk in ollama_llm.astream(messages):
+        parts.append(chunk.content)
+        if counter is not None:
+            counter[0] += 1
+    return "".join(parts)
     
 # --- 3. Define Agents/Nodes ---
 
-def router_agent_node(state: HandoffState):
+async def router_agent_node(state: HandoffState):
     """
     The Router Agent classifies the request and decides the next step.
-    It outputs the decision as a JSON string.
+    The answer is constrained to one label token (see label_classifier.py).
     """
     router_prompt = f"""
     Analyze the user's request: '{state["request"]}'.
     
-    If the request involves complex math or statistics, set 'topic' to 'MATH'.
-    Otherwise, set 'topic' to 'GENERAL'.
-    
-    Output ONLY a JSON object: {{"topic": "MATH" | "GENERAL"}}
+    If the request involves complex math or statistics, the topic is MATH.
+    Otherwise, the topic is GENERAL.
     """
     
     messages = [
-        SystemMessage(content="You are a routing expert. Output only the requested JSON structure."),
-        HumanMessage(content=router_prompt)
+        {"role": "system", "content": "You are a routing expert."},
+        {"role": "user", "content": router_prompt},
     ]
     
     try:
-        response = ollama_llm.invoke(messages).content.strip()
-        decision = json.loads(response)
-        return {"topic": decision.get("topic", "GENERAL")}
+        topic = await aclassify_label(messages, ROUTER_TOPICS, model=ollama_llm.model, default="GENERAL", host=ollama_llm.base_url)
+        return {"topic": topic}
     except Exception:
-        # Fallback if Ollama doesn't produce valid JSON
+        # Fallback if Ollama is unreachable or rejects the request
         return {"topic": "GENERAL"}
 
-def specialist_agent_node(state: HandoffState):
+async def specialist_agent_node(state: HandoffState):
     """
     The Specialist Agent handles MATH topics.
     """
@@ -53,10 +76,10 @@ def specialist_agent_node(state: HandoffState):
     specialist_prompt = f"Solve this complex statistics problem step-by-step: {state['request']}"
     messages = [SystemMessage(content="You are a brilliant mathematician."), HumanMessage(content=specialist_prompt)]
     
-    response = ollama_llm.invoke(messages).content
+    response = await generate(messages)
     return {"response": f"Math Specialist Solution: {response}"}
 
-def general_agent_node(state: HandoffState):
+async def general_agent_node(state: HandoffState):
     """
     The General Agent handles all other topics.
     """
@@ -65,7 +88,7 @@ def general_agent_node(state: HandoffState):
     general_prompt = f"Provide a brief, general answer to: {state['request']}"
     messages = [SystemMessage(content="You are a helpful general assistant."), HumanMessage(content=general_prompt)]
     
-    response = ollama_llm.invoke(messages).content
+    response = await generate(messages)
     return {"response": f"General Answer: {response}"}
 
 # --- 4. Define Routing (Conditional Edge) ---
@@ -76,29 +99,108 @@ def route_to_specialist(state: HandoffState) -> str:
     return "general"
     # 
 
+class SpeculativeBranches:
+    """
+    Speculative execution for a conditional edge. The wrapped router node starts the
+    likely branches concurrently with the classification, cancels the branches that
+    lose once the route is known, and hands the winner's output to its node, which
+    then returns it without calling the LLM again.
+
+    Only branches that do not read the router's output can be speculated this way.
+    Tokens generated by cancelled or unused branches are tracked as waste.
+    """
+    def __init__(self, router_node, route_fn, branches: Dict[str, Callable], likely: Optional[List[str]] = None):
+        self.router_node = router_node
+        self.route_fn = route_fn
+        self.branches = branches
+        self.likely = likely or list(branches)
+        self.stats = {"runs": 0, "hits": 0, "wasted_tokens": 0}
+
+    async def _run_branch(self, node, state, counter):
+        token_counter.set(counter)
+        return await node(state)
+
+    async def router(self, state: HandoffState):
+        counters = {name: [0] for name in self.likely}
+        tasks = {
+            name: asyncio.create_task(self._run_branch(self.branches[name], state, counters[name]))
+            for name in self.likely
+        }
+
+        update = await self.router_node(state)
+        route = self.route_fn({**state, **update})
+        self.stats["runs"] += 1
+
+        # Cancel every losing branch and count what it had already generated
+        losers = [task for name, task in tasks.items() if name != route]
+        for task in losers:
+            task.cancel()
+        await asyncio.gather(*losers, return_exceptions=True)
+        wasted = sum(counters[name][0] for name in tasks if name != route)
+        self.stats["wasted_tokens"] += wasted
+
+        speculative = {}
+        if route in tasks:
+            self.stats["hits"] += 1
+            speculative[route] = await tasks[route]
+        print(f"⚡ Speculation: route={route}, hit={route in tasks}, wasted ~{wasted} tokens")
+        return {**update, "speculative": speculative}
+
+    def branch(self, name: str):
+        node = self.branches[name]
+
+        async def _node(state: HandoffState):
+            done = (state.get("speculative") or {}).get(name)
+            if done is not None:
+                return done
+            return await node(state)
+        return _node
+
 # --- 5. Build the LangGraph ---
-workflow = StateGraph(HandoffState)
-workflow.add_node("router", router_agent_node)
-workflow.add_node("specialist", specialist_agent_node)
-workflow.add_node("general", general_agent_node)
+def build_graph(speculative: bool = SPECULATIVE, checkpointer=None, cache=None):
+    branches = {"specialist": specialist_agent_node, "general": general_agent_node}
+    speculation = SpeculativeBranches(router_agent_node, route_to_specialist, branches) if speculative else None
+
+    workflow = StateGraph(HandoffState)
+    workflow.add_node("router", speculation.router if speculation else router_agent_node,
+                      cache_policy=NODE_CACHE_POLICY)
+    for name, node in branches.items():
+        workflow.add_node(name, speculation.branch(name) if speculation else node,
+                          cache_policy=NODE_CACHE_POLICY)
+
+    workflow.set_entry_point("router")
+
+    # Conditional edge from Router to Specialists/General
+    workflow.add_conditional_edges(
+        "router",
+        route_to_specialist,
+        {"specialist": "specialist", "general": "general"}
+    )
 
-workflow.set_entry_point("router")
+    # Both specialist paths terminate
+    workflow.add_edge("specialist", END)
+    workflow.add_edge("general", END)
 
-# Conditional edge from Router to Specialists/General
-workflow.add_conditional_edges(
-    "router",
-    route_to_specialist,
-    {"specialist": "specialist", "general": "general"}
-)
+    return workflow.compile(checkpointer=checkpointer, cache=cache), speculation
 
-# Both specialist paths terminate
-workflow.add_edge("specialist", END)
-workflow.add_edge("general", END)
+app, speculation = build_graph()
 
-app = workflow.compile()
+async def run_durably(inputs: dict, thread_id: str, speculative: bool = SPECULATIVE):
+    """Runs the graph with SQLite checkpoints, resuming the thread if it stopped part-way."""
+    async with async_checkpointer() as saver:
+        durable_app, durable_speculation = build_graph(speculative, checkpointer=saver, cache=get_node_cache())
+        return await arun_or_resume(durable_app, inputs, thread_id), durable_speculation
 
 # Example: Run the graph
-request_math = "Calculate the standard deviation of the following data set: [10, 12, 23, 23, 16, 23, 21, 16]"
-final_state_math = app.invoke({"request": request_math, "topic": "", "response": ""})
-print("\n--- Dynamic Handoff Result (MATH) ---")
-print(final_state_math["response"])
\ No newline at end of file
+if __name__ == "__main__":
+    request_math = "Calculate the standard deviation of the following data set: [10, 12, 23, 23, 16, 23, 21, 16]"
+    started = time.perf_counter()
+    final_state_math, speculation = asyncio.run(
+        # The demo opts in to speculation to show its stats
+        run_durably({"request": request_math, "topic": "", "response": ""}, thread_id="handoff-math-1", speculative=True)
+    )
+    print("\n--- Dynamic Handoff Result (MATH) ---")
+    print(final_state_math["response"])
+    print(f"\n(Wall-clock: {time.perf_counter() - started:.1f}s)")
+    if speculation:
+        print(f"Speculation stats: {speculation.stats}")
@@ -4,7 +4,11 @@ from langchain_core.tools import tool # We still need the tool decorator
 from langchain_ollama import ChatOllama
 from langgraph.graph import StateGraph, END
 from typing import TypedDict, Annotated, List, Union
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 import operator
+import time
+# Durable SQLite checkpoints + memoized node outputs (see checkpointing.py)
+from checkpointing import NODE_CACHE_POLICY, get_checkpointer, get_node_cache, run_or_resume
 
 # --- 1. Ollama Configuration (Your validated fix) ---
 ollama_llm = ChatOllama(model="mistral", base_url="http://127.0.0.1:11434")
@@ -32,7 +36,7 @@ class AgentState(TypedDict):
 
 # The Supervisor LLM is configured to output tool calls
 tool_names = list(tool_name_map.keys())
-supervisor_system_prompt = f"""You are the SUPERVISOR AGENT. Your job is to analyze the user's request: '{{input}}', and decide which specialized tool (Agent) to call. You MUST choose one of the following tools: {tool_names}. If the request is not related to those tools, respond directly."""
+supervisor_system_prompt = f"""You are the SUPERVISOR AGENT. Your job is to analyze the user's request: '{{input}}', and decide which specialized tool (Agent) to call. You MUST choose from the following tools: {tool_names}. If the request needs several of them, call all of them at once. If the request is not related to those tools, respond directly."""
 
 supervisor_llm_with_tools = ollama_llm.bind_tools(tools)
 
@@ -46,14 +50,12 @@ def run_supervisor(state: AgentState):
     return {"agent_outcome": response}
 
 # --- 4. The FIX: Custom Tool Execution Node ---
-def execute_tools(state: AgentState):
-    """
-    Manually executes the tool call decided by the Supervisor.
-    This replaces the need for ToolExecutor.
-    """
-    # Assuming only one tool call for simplicity in this pattern
-    tool_call = state["agent_outcome"].tool_calls[0]
-    
+TOOL_TIMEOUT_SECONDS = 60.0
+# Shared pool so every tool call requested in one supervisor message runs at the same time
+tool_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="tool")
+
+def run_one_tool(tool_call) -> str:
+    """Looks up and executes a single tool call."""
     # Get the function and arguments
     tool_name = tool_call["name"]
     tool_args = tool_call["args"]
@@ -61,14 +63,36 @@ def execute_tools(state: AgentState):
     # Look up and execute the tool
     selected_tool_fn = tool_name_map.get(tool_name)
     
-    if selected_tool_fn:
-        # **Crucial: We use the .invoke() method of the LangChain tool object**
-        output = selected_tool_fn.invoke(tool_args)
-        
-        # Return the tool output to the chat history
-        return {"chat_history": [HumanMessage(content=f"Tool {tool_name} executed. Result: {output}")]}
-    else:
-        return {"chat_history": [HumanMessage(content="Error: Tool not found.")]}
+    if not selected_tool_fn:
+        return "Error: Tool not found."
+    # **Crucial: We use the .invoke() method of the LangChain tool object**
+    output = selected_tool_fn.invoke(tool_args)
+    return f"Tool {tool_name} executed. Result: {output}"
+
+def execute_tools(state: AgentState):
+    """
+    Manually executes every tool call decided by the Supervisor, concurrently.
+    This replaces the need for ToolExecutor.
+    """
+    tool_calls = state["agent_outcome"].tool_calls
+    futures = [tool_pool.submit(run_one_tool, tool_call) for tool_call in tool_calls]
+    # Each day folder is self-contained, so this fan-out is duplicated on purpose in
+    # day4/cryptopricechecker.py (run_manual_agent); keep the two in step.
+    # All calls start together, so they share one deadline
+    deadline = time.monotonic() + TOOL_TIMEOUT_SECONDS
+
+    # Collect in call order; a slow or failing tool only affects its own message
+    results = []
+    for tool_call, future in zip(tool_calls, futures):
+        try:
+            results.append(future.result(timeout=max(0.0, deadline - time.monotonic())))
+        except FutureTimeoutError:
+            results.append(f"Error: Tool {tool_call['name']} timed out after {TOOL_TIMEOUT_SECONDS:.0f}s.")
+        except Exception as e:
+            results.append(f"Error: Tool {tool_call['name']} failed: {e}")
+
+    # Return the tool outputs to the chat history
+    return {"chat_history": [HumanMessage(content=r) for r in results]}
 
 # --- 5. Define Routing ---
 def route_next(state: AgentState):
@@ -80,7 +104,7 @@ def route_next(state: AgentState):
 
 # --- 6. Build the LangGraph ---
 workflow = StateGraph(AgentState)
-workflow.add_node("supervisor", run_supervisor)
+workflow.add_node("supervisor", run_supervisor, cache_policy=NODE_CACHE_POLICY)
 workflow.add_node("call_tool", execute_tools) # <-- Use the custom node
 
 workflow.set_entry_point("supervisor")
@@ -93,9 +117,10 @@ workflow.add_conditional_edges(
 # After the tool is called, the graph ends (for this simple example)
 workflow.add_edge('call_tool', END) 
 
-app = workflow.compile()
+# State is saved after every node, so a crashed run resumes from the last finished node
+app = workflow.compile(checkpointer=get_checkpointer(), cache=get_node_cache())
 
 # Example invocation:
 inputs = {"input": "I need documentation for a function: def my_func(x): return x*2", "chat_history": []}
-final_state = app.invoke(inputs)
+final_state = run_or_resume(app, inputs, thread_id="doc-request-1")
 print(final_state["chat_history"])
\ No newline at end of file
@@ -0,0 +1,92 @@
+"""
+Constrained classification for calls that only need one label out of a closed set.
+
+Instead of letting the model write "The category is MATH." and parsing it:
+- "enum" mode (default) numbers the labels and passes Ollama a JSON schema whose only
+  valid outputs are those numbers. With up to 9 labels the answer is a single token, so
+  num_predict=1 and generation time is the same for every call.
+- "stop" mode is for models/servers without format support: the model writes the label
+  itself, cut off by a newline stop sequence and a num_predict just long enough for the
+  longest label. The text is then matched back to a label.
+
+Usage:
+    label = classify_label(messages, ["Positive", "Negative"], model="llama3", default="Negative")
+
+Each day folder is self-contained, so day2/ keeps an identical copy of this file;
+change both together.
+"""
+import asyncio
+import weakref
+
+import ollama
+
+# An AsyncClient's connection pool belongs to the event loop it was created on,
+# so aclassify_label keeps one client per (loop, host)
+_async_clients = weakref.WeakKeyDictionary()  # loop -> {host: ollama.AsyncClient}
+
+def _async_client(host=None):
+    clients = _async_clients.setdefault(asyncio.get_running_loop(), {})
+    if host not in clients:
+        clients[host] = ollama.AsyncClient(host=host)
+    return clients[host]
+
+def options_prompt(labels):
+    options = "\n".join(f"{i}. {label}" for i, label in enumerate(labels, 1))
+    return f"Choose exactly one of these options and answer with its number only:\n{options}"
+
+def label_num_predict(labels):
+    """Token budget for the longest label (~3 characters per token, rounded up)."""
+    return max(-(-len(label) // 3) for label in labels) + 1
+
+def match_label(text, labels, default=None):
+    """Maps model output back to a label: exact match, then containment, then truncated prefix."""
+    cleaned = text.strip().strip('."\'').upper()
+    by_upper = {label.upper(): label for label in labels}
+    if cleaned in by_upper:
+        return by_upper[cleaned]
+    contained = [label for upper, label in by_upper.items() if upper in cleaned]
+    if len(contained) == 1:
+        return contained[0]
+    prefixed = [label for upper, label in by_upper.items() if cleaned and upper.startswith(cleaned)]
+    return prefixed[0] if len(prefixed) == 1 else default
+
+def _request(messages, labels, mode):
+    """Builds the chat arguments for one constrained classification call."""
+    labels = list(labels)
+    if mode == "enum":
+        last = messages[-1]
+        messages = messages[:-1] + [{**last, "content": f"{last['content']}\n\n{options_prompt(labels)}"}]
+        return dict(
+            messages=messages,
+            format={"type": "integer", "enum": list(range(1, len(labels) + 1))},
+            options={"temperature": 0, "num_predict": len(str(len(labels)))},
+        )
+    if mode == "stop":
+        return dict(
+            messages=messages,
+            options={"temperature": 0, "num_predict": label_num_predict(labels), "stop": ["\n"]},
+        )
+    raise ValueError(f"Unknown classification mode: {mode}")
+
+def _parse(content, labels, mode, default):
+    labels = list(labels)
+    if mode == "enum":
+        content = content.strip()
+        if content.isdigit() and 1 <= int(content) <= len(labels):
+            return labels[int(content) - 1]
+        return default
+    return match_label(content, labels, default)
+
+def classify_label(messages, labels, model="llama3", mode="enum", default=None, client=ollama):
+    """Returns exactly one of `labels` (or `default` if the output cannot be mapped)."""
+    response = client.chat(model=model, **_request(messages, labels, mode))
+    return _parse(response["message"]["content"], labels, mode, default)
+
+async def aclassify_label(messages, labels, model="llama3", mode="enum", default=None, client=None, host=None):
+    """
+    Async version of classify_label. Without a `client`, reuses one ollama.AsyncClient
+    per event loop for `host`.
+    """
+    client = client or _async_client(host)
+    response = await client.chat(model=model, **_request(messages, labels, mode))
+    return _parse(response["message"]["content"], labels, mode, default)
@@ -5,13 +5,72 @@ Concept: A central "Manager" breaks a complex task into sub-tasks, assigns them
 
 Use Case: "Write a software spec." (Manager breaks it into: UI Design, Database Schema, and API Endpoints).
 """
+import asyncio
 import ollama
 import json
+import time
+
+# --- Configuration ---
+MODEL = 'llama3'
+MAX_IN_FLIGHT = 3        # how many workers may call the model at the same time
+WORKER_TIMEOUT = 120.0   # seconds before a worker is given up on
+REDUCE_FANIN = 2         # merge results in groups of this size while other workers still run
+MERGE_TIMEOUT = 120.0    # seconds before an intermediate merge is given up on
+
+async def run_worker(client, task):
+    print(f"--- Worker processing: {task} ---")
+    worker_response = await client.chat(model=MODEL, messages=[
+        {'role': 'system', 'content': 'You are a specialist worker. Complete this task concisely.'},
+        {'role': 'user', 'content': task},
+    ])
+    return worker_response['message']['content']
+
+async def run_worker_safely(client, task, semaphore):
+    """Returns (task, result, error) so one failing worker never sinks the whole job."""
+    async with semaphore:
+        return await _timed_worker(client, task)
+
+async def _timed_worker(client, task):
+    start = time.perf_counter()
+    try:
+        # The timeout covers the model call only, not the wait for a free slot
+        result = await asyncio.wait_for(run_worker(client, task), timeout=WORKER_TIMEOUT)
+        print(f"--- Worker done in {time.perf_counter() - start:.1f}s: {task} ---")
+        return task, result, None
+    except Exception as e:
+        error = 'timed out' if isinstance(e, asyncio.TimeoutError) else str(e)
+        print(f"--- Worker FAILED ({error}): {task} ---")
+        return task, None, error
+
+async def merge_partial(client, complex_task, sections):
+    """Intermediate reduce: combines a few worker outputs while the rest are still running."""
+    response = await client.chat(model=MODEL, messages=[
+        {'role': 'system', 'content': 'You are a Project Manager. Merge these worker outputs into one combined section. Keep every concrete detail.'},
+        {'role': 'user', 'content': f"Original Goal: {complex_task}\n\nWorker Outputs:\n" + "\n\n".join(sections)},
+    ])
+    return response['message']['content']
+
+async def merge_partial_safely(client, complex_task, sections):
+    """Falls back to the unmerged sections if the merge fails or times out."""
+    try:
+        merged = await asyncio.wait_for(merge_partial(client, complex_task, sections), timeout=MERGE_TIMEOUT)
+        return [f"Merged Section:\n{merged}"]
+    except Exception as e:
+        error = 'timed out' if isinstance(e, asyncio.TimeoutError) else str(e)
+        print(f"--- Merge FAILED ({error}), keeping {len(sections)} raw section(s) ---")
+        return sections
+
+async def orchestrator_worker_async(complex_task):
+    # The client's connection pool belongs to the running event loop, so it is created per run
+    async with ollama.AsyncClient() as client:
+        return await _orchestrate(client, complex_task)
+
+async def _orchestrate(client, complex_task):
+    started = time.perf_counter()
 
-def orchestrator_worker(complex_task):
     # 1. Orchestrator: Plan the sub-tasks
     print("--- Orchestrator: Planning ---")
-    plan_response = ollama.chat(model='llama3', format='json', messages=[
+    plan_response = await client.chat(model=MODEL, format='json', messages=[
         {'role': 'system', 'content': 'You are a Project Manager. Break the task into 3 distinct sub-tasks. Return JSON: {"tasks": ["task1", "task2", "task3"]}'},
         {'role': 'user', 'content': complex_task},
     ])
@@ -20,28 +79,43 @@ def orchestrator_worker(complex_task):
     tasks = plan.get('tasks', [])
     print(f"Plan: {tasks}")
 
-    results = {}
+    # 2. Workers: Execute sub-tasks concurrently, at most MAX_IN_FLIGHT at a time
+    semaphore = asyncio.Semaphore(MAX_IN_FLIGHT)
+    workers = [asyncio.create_task(run_worker_safely(client, task, semaphore)) for task in tasks]
+
+    # 3. Reduce incrementally: as soon as REDUCE_FANIN results are in, merge them
+    #    in the background instead of waiting for the slowest worker
+    ready, merges, failures = [], [], []
+    for finished in asyncio.as_completed(workers):
+        task, result, error = await finished
+        if error:
+            failures.append(f"{task} ({error})")
+            continue
+        ready.append(f"Task: {task}\nResult: {result}")
+        if len(workers) > REDUCE_FANIN and len(ready) >= REDUCE_FANIN:
+            merges.append(asyncio.create_task(merge_partial_safely(client, complex_task, ready)))
+            ready = []
 
-    # 2. Workers: Execute sub-tasks (In a real app, use asyncio for parallel execution)
-    for task in tasks:
-        print(f"--- Worker processing: {task} ---")
-        worker_response = ollama.chat(model='llama3', messages=[
-            {'role': 'system', 'content': 'You are a specialist worker. Complete this task concisely.'},
-            {'role': 'user', 'content': task},
-        ])
-        results[task] = worker_response['message']['content']
+    sections = [section for merged in await asyncio.gather(*merges) for section in merged] + ready
+    final_context = "\n\n".join(sections)
+    if failures:
+        final_context += "\n\nSub-tasks that could not be completed: " + "; ".join(failures)
 
-    # 3. Orchestrator: Synthesize
+    # 4. Orchestrator: Synthesize
     print("\n--- Orchestrator: Synthesizing ---")
-    final_context = "\n".join([f"Task: {k}\nResult: {v}" for k, v in results.items()])
-    
-    summary_response = ollama.chat(model='llama3', messages=[
+    summary_response = await client.chat(model=MODEL, messages=[
         {'role': 'system', 'content': 'You are a Project Manager. Merge these worker outputs into a final cohesive report.'},
         {'role': 'user', 'content': f"Original Goal: {complex_task}\n\nWorker Outputs:\n{final_context}"},
     ])
     
     print("\n=== Final Report ===")
     print(summary_response['message']['content'])
+    print(f"\n(Total wall-clock time: {time.perf_counter() - started:.1f}s)")
+    return summary_response['message']['content']
+
+def orchestrator_worker(complex_task):
+    return asyncio.run(orchestrator_worker_async(complex_task))
 
 # Usage
-orchestrator_worker("Design a concept for a new fitness tracking mobile app")
\ No newline at end of file
+if __name__ == "__main__":
+    orchestrator_worker("Design a concept for a new fitness tracking mobile app")
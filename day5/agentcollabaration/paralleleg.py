@@ -2,35 +2,60 @@
 import asyncio
 import httpx
 import json
+import time
 
 # --- 1. Configuration ---
 OLLAMA_URL = "http://localhost:11434/api/generate"
 MODEL_NAME = "llama3"
 TIMEOUT_SECONDS = 300.0
+# Connection pool shared by every call in the workflow
+POOL_LIMITS = httpx.Limits(max_connections=10, max_keepalive_connections=10)
+
 # --- 2. Worker Function (Async) ---
-async def fetch_ollama_response(prompt: str, task_name: str) -> dict:
-    """Asynchronously calls the Ollama API for a specific task."""
+async def fetch_ollama_response(client: httpx.AsyncClient, prompt: str, task_name: str, echo: bool = False) -> dict:
+    """Asynchronously streams the Ollama API response for a specific task."""
     print(f"🤖 Starting {task_name}...")
     
     # Payload for the Ollama /generate endpoint
     payload = {
         "model": MODEL_NAME,
         "prompt": f"You are a specialized {task_name}. {prompt}. Output only the result.",
-        "stream": False 
+        "stream": True
     }
     
-    # Use httpx for asynchronous requests
-    async with httpx.AsyncClient(timeout=TIMEOUT_SECONDS) as client:
-        response = await client.post(OLLAMA_URL, json=payload)
+    started = time.perf_counter()
+    first_token_at = None
+    chunks = []
+
+    # The shared client reuses pooled connections instead of opening a new one per call
+    async with client.stream("POST", OLLAMA_URL, json=payload) as response:
         response.raise_for_status()
-        
-        # Ollama returns a JSON response; extract the final 'response' field
-        data = response.json()
-        print(f"✅ {task_name} finished.")
-        return {
-            "task_name": task_name,
-            "result": data.get("response", "No response found")
-        }
+
+        # Ollama streams one JSON object per line; collect the 'response' pieces as they arrive
+        async for line in response.aiter_lines():
+            if not line:
+                continue
+            data = json.loads(line)
+            if data.get("response"):
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                chunks.append(data["response"])
+                if echo:
+                    print(data["response"], end="", flush=True)
+            if data.get("done"):
+                break
+
+    finished = time.perf_counter()
+    timing = {
+        "first_token_s": round((first_token_at or finished) - started, 2),
+        "total_s": round(finished - started, 2),
+    }
+    print(f"✅ {task_name} finished. (first token {timing['first_token_s']}s, total {timing['total_s']}s)")
+    return {
+        "task_name": task_name,
+        "result": "".join(chunks) or "No response found",
+        "timing": timing,
+    }
 
 # --- 3. Coordinator/Aggregator Function ---
 async def run_parallel_analysis(user_query: str):
@@ -40,31 +65,40 @@ async def run_parallel_analysis(user_query: str):
         (f"Determine the key financial risks for 'Tesla' in Q3 2024 based on expert opinions. Query: {user_query}", "Financial Risk Analyst")
     ]
     
-    # Create the list of concurrent tasks
-    tasks = [
-        fetch_ollama_response(prompt, task_name)
-        for prompt, task_name in prompts_and_tasks
-    ]
-    
-    # Run all tasks concurrently
-    parallel_results = await asyncio.gather(*tasks)
-    
-    # --- Aggregation (Final Ollama Call) ---
-    aggregation_prompt = f"""
-    You are the Final Investment Strategist. Synthesize the following two reports into a single, cohesive investment recommendation for Tesla.
-    
-    1. Sentiment Report: {parallel_results[0]['result']}
-    2. Financial Risk Report: {parallel_results[1]['result']}
-    
-    Provide a final 'BUY', 'HOLD', or 'SELL' recommendation and a brief justification.
-    """
+    async with httpx.AsyncClient(timeout=TIMEOUT_SECONDS, limits=POOL_LIMITS) as client:
+        # Create the list of concurrent tasks
+        tasks = [
+            fetch_ollama_response(client, prompt, task_name)
+            for prompt, task_name in prompts_and_tasks
+        ]
+        
+        # Run all tasks concurrently; each returns the moment its stream reports 'done'
+        parallel_results = await asyncio.gather(*tasks)
+        
+        # --- Aggregation (Final Ollama Call) ---
+        # Fixed instructions first and the reports last, so Ollama can reuse the cached
+        # prompt prefix across runs and only has to evaluate the new report text
+        aggregation_prompt = f"""
+        You are the Final Investment Strategist. Synthesize the following two reports into a single, cohesive investment recommendation for Tesla.
+        Provide a final 'BUY', 'HOLD', or 'SELL' recommendation and a brief justification.
+        
+        1. Sentiment Report: {parallel_results[0]['result']}
+        2. Financial Risk Report: {parallel_results[1]['result']}
+        """
+
+        final_result = await fetch_ollama_response(client, aggregation_prompt, "Aggregator", echo=True)
 
-    final_result = await fetch_ollama_response(aggregation_prompt, "Aggregator")
+    final_result["timings"] = {r["task_name"]: r["timing"] for r in parallel_results + [final_result]}
     return final_result
 
 # --- 4. Run the Workflow ---
 if __name__ == "__main__":
      user_input = "Give me an investment summary for Tesla."
+     started = time.perf_counter()
      final_report = asyncio.run(run_parallel_analysis(user_input))
-     print("\n--- Parallel/Aggregation Workflow Result ---")
-     print(final_report['result'])
\ No newline at end of file
+     # The aggregator's answer was already streamed to stdout as it was generated
+     print("\n\n--- Parallel/Aggregation Workflow Done ---")
+     print("\n--- Per-Task Timings ---")
+     for task_name, timing in final_report['timings'].items():
+         print(f"{task_name}: first token {timing['first_token_s']}s, total {timing['total_s']}s")
+     print(f"Workflow wall-clock: {time.perf_counter() - started:.2f}s")
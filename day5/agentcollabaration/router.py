@@ -4,18 +4,115 @@ A "Gatekeeper" agent analyzes the user request and decides which specialist agen
 
 Pattern: User -> Router -> (Agent A OR Agent B OR Agent C)
 """
+import math
+import time
 import ollama
+from label_classifier import classify_label
 
-def router_pattern(user_query):
+ROUTER_MODEL = 'llama3'
+EMBED_MODEL = 'nomic-embed-text'
+ROUTES = ["MATH", "WRITING", "TECH_SUPPORT"]
+
+# Labelled example utterances for each route; the semantic router matches against these
+ROUTE_EXAMPLES = {
+    "MATH": [
+        "Calculate the square root of 144",
+        "What is 15% of 240?",
+        "Solve 2x + 5 = 17",
+        "What is the derivative of x squared?",
+        "How many combinations of 3 items from 10 are there?",
+    ],
+    "WRITING": [
+        "Write a poem about rust",
+        "Compose a haiku about autumn leaves",
+        "Draft a short story opening about a lighthouse",
+        "Write a limerick about a cat",
+        "Help me write a toast for my sister's wedding",
+    ],
+    "TECH_SUPPORT": [
+        "My laptop won't turn on",
+        "The wifi keeps disconnecting",
+        "How do I reset my email password?",
+        "My printer says it is offline",
+        "The app crashes when I open it",
+    ],
+}
+
+def llm_route(user_query):
+    """The original router: a chat call constrained to a single label token."""
+    return classify_label([
+        {'role': 'system', 'content': 'You are a router. Classify the query into exactly one of these categories: "MATH", "WRITING", "TECH_SUPPORT".'},
+        {'role': 'user', 'content': user_query},
+    ], ROUTES, model=ROUTER_MODEL, default="TECH_SUPPORT")
+
+def cosine(a, b):
+    dot = sum(x * y for x, y in zip(a, b))
+    return dot / (math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b)) or 1.0)
+
+class SemanticRouter:
+    """
+    Routes by comparing the query embedding with the labelled examples of each route.
+    Decisions are cached per normalized query, and the LLM router is only called when
+    the best match is weak or too close to the runner-up.
+    """
+    def __init__(self, examples=ROUTE_EXAMPLES, min_similarity=0.55, min_margin=0.03, cache_size=10000):
+        self.min_similarity = min_similarity
+        self.min_margin = min_margin
+        self.cache_size = cache_size
+        self.cache = {}
+        self.stats = {"cache": 0, "semantic": 0, "llm_fallback": 0}
+
+        # Embed every example once, in a single call
+        texts = [t for utterances in examples.values() for t in utterances]
+        vectors = ollama.embed(model=EMBED_MODEL, input=texts)['embeddings']
+        self.examples = []
+        i = 0
+        for route, utterances in examples.items():
+            self.examples.append((route, vectors[i:i + len(utterances)]))
+            i += len(utterances)
+
+    @staticmethod
+    def normalize(query):
+        return " ".join(query.lower().split())
+
+    def route(self, user_query):
+        key = self.normalize(user_query)
+        if key in self.cache:
+            self.stats["cache"] += 1
+            return self.cache[key]
+
+        query_vec = ollama.embed(model=EMBED_MODEL, input=key)['embeddings'][0]
+        scores = sorted(
+            ((max(cosine(query_vec, v) for v in vectors), route) for route, vectors in self.examples),
+            reverse=True,
+        )
+        (best, route), runner_up = scores[0], scores[1][0] if len(scores) > 1 else 0.0
+
+        if best >= self.min_similarity and best - runner_up >= self.min_margin:
+            self.stats["semantic"] += 1
+        else:
+            # Low confidence: let the LLM decide
+            self.stats["llm_fallback"] += 1
+            route = llm_route(user_query)
+
+        if len(self.cache) >= self.cache_size:
+            self.cache.pop(next(iter(self.cache)))  # drop the oldest entry
+        self.cache[key] = route
+        return route
+
+_semantic_router = None
+
+def get_semantic_router():
+    global _semantic_router
+    if _semantic_router is None:
+        _semantic_router = SemanticRouter()
+    return _semantic_router
+
+def router_pattern(user_query, use_semantic_router=True):
     print(f"User Query: {user_query}")
     
-    # 1. Router Agent (Classifier)
-    # We force the output to be a single word for easy parsing
-    router_response = ollama.chat(model='llama3', messages=[
-        {'role': 'system', 'content': 'You are a router. Classify the query into exactly one of these categories: "MATH", "WRITING", "TECH_SUPPORT". Do not add punctuation or other text.'},
-        {'role': 'user', 'content': user_query},
-    ])
-    category = router_response['message']['content'].strip().upper()
+    # 1. Router Agent (Classifier): embeddings first, LLM only when unsure
+    category = get_semantic_router().route(user_query) if use_semantic_router else llm_route(user_query)
     print(f"Router decided: {category}")
 
     # 2. Handoff to Specialist
@@ -33,6 +130,35 @@ def router_pattern(user_query):
     
     print(f"Response: {final_response['message']['content']}")
 
-# Usage Examples:
-router_pattern("Calculate the square root of 144")
-router_pattern("Write a poem about rust")
\ No newline at end of file
+def benchmark_routers(labelled):
+    """Compares routing accuracy and latency of the LLM-only and semantic routers."""
+    router = get_semantic_router()
+    results = {}
+    for name, route_fn in (("llm-only", llm_route), ("semantic", router.route), ("semantic (cached)", router.route)):
+        correct, start = 0, time.perf_counter()
+        for query, expected in labelled:
+            correct += route_fn(query) == expected
+        elapsed = time.perf_counter() - start
+        results[name] = (correct / len(labelled), elapsed / len(labelled) * 1000)
+
+    print(f"\n{'router':<20}{'accuracy':>10}{'avg ms':>10}")
+    for name, (accuracy, ms) in results.items():
+        print(f"{name:<20}{accuracy:>10.2f}{ms:>10.1f}")
+    print(f"Semantic router decisions: {router.stats}")
+
+if __name__ == "__main__":
+    # Usage Examples:
+    router_pattern("Calculate the square root of 144")
+    router_pattern("Write a poem about rust")
+
+    benchmark_routers([
+        ("What is 7 times 8?", "MATH"),
+        ("Find the area of a circle with radius 3", "MATH"),
+        ("Is 97 a prime number?", "MATH"),
+        ("Write a sonnet about the sea", "WRITING"),
+        ("Give me a rhyming birthday message", "WRITING"),
+        ("Write a short bedtime story about a dragon", "WRITING"),
+        ("My keyboard stopped working", "TECH_SUPPORT"),
+        ("I can't connect to the VPN", "TECH_SUPPORT"),
+        ("My phone screen is frozen", "TECH_SUPPORT"),
+    ])
@@ -2,18 +2,57 @@
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
 from langchain_ollama import ChatOllama
 from langgraph.graph import StateGraph, END
-from typing import TypedDict, Annotated
+from typing import TypedDict, Annotated, List
+import difflib
+import json
 import operator
 import re
+# Durable SQLite checkpoints + memoized node outputs (see checkpointing.py)
+from checkpointing import NODE_CACHE_POLICY, get_checkpointer, get_node_cache, run_or_resume
 
 # --- 1. Ollama Configuration ---
-ollama_llm = ChatOllama(model="llama3", base_url="http://localhost:11434")
+# Per-node models: critique is close to a classification task, so it runs on a small,
+# fast model and only escalates to the large one when its verdict is uncertain
+NODE_MODELS = {
+    "writer": "llama3",
+    "critic": "llama3.2:1b",
+    "critic_escalation": "llama3",
+}
+CRITIC_CONFIDENCE_THRESHOLD = 0.7
+
+ollama_llm = ChatOllama(model=NODE_MODELS["writer"], base_url="http://localhost:11434")
+critic_llm = ChatOllama(model=NODE_MODELS["critic"], base_url="http://localhost:11434", format="json", temperature=0)
+escalation_llm = ChatOllama(model=NODE_MODELS["critic_escalation"], base_url="http://localhost:11434", format="json", temperature=0)
 
 # --- 2. Define State ---
-class RefineState(TypedDict):
+class RefineState(TypedDict, total=False):
     draft: str
     feedback: str
     iteration: Annotated[int, operator.add]
+    previous_draft: str        # draft before the last refinement, for diff-based review
+    addressed_feedback: str    # feedback the last refinement was meant to fix
+    sections: List[int]        # paragraph numbers the critic wants rewritten
+
+def split_paragraphs(text: str) -> List[str]:
+    return [p.strip() for p in re.split(r"\n\s*\n", text.strip()) if p.strip()]
+
+def numbered(paragraphs: List[str]) -> str:
+    return "\n\n".join(f"[{i}] {p}" for i, p in enumerate(paragraphs, 1))
+
+def paragraph_index(paragraphs: List[str], width: int = 60) -> str:
+    """One short line per paragraph, so the critic knows the numbering without re-reading it all."""
+    return "\n".join(f"[{i}] {p.splitlines()[0][:width]}" for i, p in enumerate(paragraphs, 1))
+
+def changed_paragraphs(previous: List[str], paragraphs: List[str]) -> str:
+    """The new or rewritten paragraphs with their current numbers, plus a note for removed ones."""
+    changes = []
+    for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(a=previous, b=paragraphs, autojunk=False).get_opcodes():
+        if tag == "equal":
+            continue
+        changes += [f"[{j}] {paragraphs[j - 1]}" for j in range(j1 + 1, j2 + 1)]
+        if tag == "delete":
+            changes.append(f"({i2 - i1} paragraph(s) removed before [{j1 + 1}])")
+    return "\n\n".join(changes)
 
 # --- 3. Define Nodes (Agents) ---
 
@@ -22,7 +61,17 @@ def writer_node(state: RefineState) -> RefineState:
     print(f"\n📝 Writer Agent: Iteration {state['iteration'] + 1}")
     
     prompt = f"TASK: Draft a 300-word introduction to 'Quantum Computing for Beginners'."
-    if state["feedback"]:
+    paragraphs = split_paragraphs(state.get("draft", ""))
+    targets = [i for i in state.get("sections") or [] if 1 <= i <= len(paragraphs)]
+
+    if state["feedback"] and targets:
+        # Targeted refinement: send only the paragraphs the critic flagged
+        prompt = (
+            f"REFINEMENT TASK: Rewrite ONLY the paragraphs below based on this feedback:\n'{state['feedback']}'\n\n"
+            + "\n\n".join(f"Paragraph {i}:\n{paragraphs[i - 1]}" for i in targets)
+            + f"\n\nOutput the {len(targets)} rewritten paragraph(s) in the same order, separated by a line containing only '---'."
+        )
+    elif state["feedback"]:
         prompt = f"REFINEMENT TASK: Refine the previous draft based on this feedback:\n'{state['feedback']}'\n\nPrevious Draft:\n'{state['draft']}'\n\nGenerate the new, improved draft. Output ONLY the new draft."
 
     messages = [
@@ -31,37 +80,83 @@ def writer_node(state: RefineState) -> RefineState:
     ]
     
     response = ollama_llm.invoke(messages)
-    return {"draft": response.content, "feedback": "", "iteration": 1}
+    draft = response.content
+
+    if state["feedback"] and targets:
+        rewritten = [p.strip() for p in re.split(r"^\s*---\s*$", response.content, flags=re.MULTILINE) if p.strip()]
+        if len(rewritten) == len(targets):
+            for i, text in zip(targets, rewritten):
+                paragraphs[i - 1] = text
+            draft = "\n\n".join(paragraphs)
+        else:
+            # The model did not keep the format; fall back to a full-draft refinement
+            print("⚠️ Writer: targeted rewrite came back malformed, refining the full draft.")
+            return writer_node({**state, "sections": []})
+
+    return {
+        "draft": draft,
+        "previous_draft": state.get("draft", ""),
+        "addressed_feedback": state["feedback"],
+        "feedback": "",
+        "sections": [],
+        "iteration": 1,
+    }
+
+def parse_verdict(content: str):
+    """Returns (approved, confidence, feedback, sections), or None if the JSON is unusable."""
+    try:
+        data = json.loads(content)
+        verdict = str(data["verdict"]).strip().upper()
+        confidence = float(data.get("confidence", 0))
+    except (ValueError, KeyError, TypeError):
+        return None
+    if verdict not in ("APPROVED", "REVISE"):
+        return None
+    sections = [int(i) for i in data.get("sections", []) if str(i).isdigit()]
+    return verdict == "APPROVED", confidence, str(data.get("feedback", "")).strip(), sections
 
 def critic_node(state: RefineState) -> RefineState:
     """The Critic Agent reviews the draft and provides feedback or approval."""
     print(f"🧐 Critic Agent: Reviewing Draft...")
 
+    paragraphs = split_paragraphs(state["draft"])
+    previous = split_paragraphs(state.get("previous_draft", ""))
+    if previous and state.get("addressed_feedback"):
+        # Re-review: only the changed paragraphs and the feedback they were meant to fix
+        material = f"""
+    The previous version received this feedback: '{state['addressed_feedback']}'
+    Changed paragraphs (current numbering):\n{changed_paragraphs(previous, paragraphs) or '(no changes)'}
+    Judge whether the feedback has been addressed and the changes are good.
+    Paragraph index (first line of each):\n{paragraph_index(paragraphs)}"""
+    else:
+        material = f"\n    Draft (paragraphs are numbered):\n{numbered(paragraphs)}"
+
     prompt = f"""
     Review the following draft. Check for clarity, tone (beginner-friendly), and accuracy.
-    
-    If the draft is EXCELLENT and ready, respond with the single word: **APPROVED**.
-    
-    If it needs improvement, provide SPECIFIC, actionable feedback starting with 'FEEDBACK: ' (e.g., 'FEEDBACK: Simplify the explanation of superposition and use an analogy.').
-    
-    Draft:\n{state['draft']}
+    {material}
+
+    Respond with ONLY a JSON object:
+    {{"verdict": "APPROVED" | "REVISE", "confidence": <0.0-1.0>, "feedback": "<specific, actionable feedback>", "sections": [<paragraph numbers to rewrite>]}}
     """
     messages = [
         SystemMessage(content="You are a meticulous content reviewer."),
         HumanMessage(content=prompt)
     ]
     
-    response = ollama_llm.invoke(messages)
-    
-    # Use simple string check for this example
-    if response.content.strip().upper() == "APPROVED":
+    result = parse_verdict(critic_llm.invoke(messages).content)
+    if result is None or result[1] < CRITIC_CONFIDENCE_THRESHOLD:
+        print(f"🔼 CRITIC: Small model unsure, escalating to '{NODE_MODELS['critic_escalation']}'...")
+        result = parse_verdict(escalation_llm.invoke(messages).content) or (False, 0.0, "Improve clarity for beginners.", [])
+
+    approved, _, feedback, sections = result
+    if approved:
         print("🎉 CRITIC: APPROVED!")
         return {"feedback": "APPROVED"}
     else:
         # Extract feedback (e.g., stripping 'FEEDBACK: ')
-        feedback = re.sub(r'FEEDBACK:\s*', '', response.content, flags=re.IGNORECASE).strip()
-        print(f"❌ CRITIC: Provided Feedback: {feedback}")
-        return {"feedback": feedback}
+        feedback = re.sub(r'FEEDBACK:\s*', '', feedback, flags=re.IGNORECASE).strip() or "Improve clarity for beginners."
+        print(f"❌ CRITIC: Provided Feedback: {feedback} (sections: {sections or 'all'})")
+        return {"feedback": feedback, "sections": sections}
 
 # --- 4. Define Conditional Edge (Router) ---
 def route_refinement(state: RefineState) -> str:
@@ -77,8 +172,9 @@ def route_refinement(state: RefineState) -> str:
 
 # --- 5. Build the LangGraph ---
 workflow = StateGraph(RefineState)
-workflow.add_node("writer", writer_node)
-workflow.add_node("critic", critic_node)
+# Cached nodes: a retry that reaches the same state reuses the finished generation
+workflow.add_node("writer", writer_node, cache_policy=NODE_CACHE_POLICY)
+workflow.add_node("critic", critic_node, cache_policy=NODE_CACHE_POLICY)
 
 workflow.set_entry_point("writer")
 
@@ -92,10 +188,11 @@ workflow.add_conditional_edges(
     {"writer": "writer", "end": END}
 )
 
-app = workflow.compile()
+# State is saved after every node, so a crash mid-loop resumes from the last finished node
+app = workflow.compile(checkpointer=get_checkpointer(), cache=get_node_cache())
 
-# Example: Run the graph
+# Example: Run the graph (re-running after a crash resumes the same thread)
 # initial_state = {"draft": "", "feedback": "", "iteration": 0}
-# final_state = app.invoke(initial_state)
+# final_state = run_or_resume(app, initial_state, thread_id="quantum-intro-1")
 # print("\n--- Iterative Refinement Final Draft ---")
 # print(final_state["draft"])
\ No newline at end of file
@@ -1,6 +1,8 @@
 # pip install crewai langchain-community
 from crewai import Agent, Task, Crew, Process,LLM
 from langchain_ollama import ChatOllama
+import hashlib
+import json
 import os
 
 # Set a dummy key to satisfy the internal library check, 
@@ -55,6 +57,59 @@ project_crew = Crew(
     verbose=True
 )
 
-result = project_crew.kickoff(inputs={})
+# --- 5. Task Output Cache (incremental re-runs) ---
+# Like a build system: each task's output is stored under a key made of
+# (agent role, task description, expected_output, inputs, model) plus the keys of the
+# upstream tasks. A re-run reuses every task whose key is unchanged and only
+# recomputes the tasks downstream of whatever changed.
+TASK_CACHE_DIR = "crew_task_cache"
+CONTEXT_DIVIDER = "\n\n----------\n\n"  # same divider CrewAI uses between task outputs
+
+def task_cache_key(task: Task, inputs: dict, upstream_keys: list) -> str:
+    agent = task.agent
+    payload = {
+        "role": agent.role,
+        "description": task.description,
+        "expected_output": task.expected_output,
+        "inputs": inputs,
+        "model": getattr(agent.llm, "model", str(agent.llm)),
+        "upstream": upstream_keys,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+def kickoff_cached(crew: Crew, inputs: dict = None, cache_dir: str = TASK_CACHE_DIR) -> str:
+    """Runs a sequential crew task by task, reusing cached outputs where possible."""
+    inputs = inputs or {}
+    os.makedirs(cache_dir, exist_ok=True)
+
+    # Fill {placeholders} in the task and agent definitions, as kickoff() would
+    if inputs:
+        for task in crew.tasks:
+            task.interpolate_inputs_and_add_conversation_history(inputs)
+        for agent in crew.agents:
+            agent.interpolate_inputs(inputs)
+
+    outputs, keys = [], []
+    for task in crew.tasks:
+        key = task_cache_key(task, inputs, keys)
+        path = os.path.join(cache_dir, f"{key}.json")
+
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                raw = json.load(f)["raw"]
+            print(f"♻️ Cache hit: '{task.agent.role}' reused its previous output.")
+        else:
+            print(f"▶️ Cache miss: running '{task.agent.role}'...")
+            context = CONTEXT_DIVIDER.join(outputs) if outputs else None
+            raw = task.execute_sync(agent=task.agent, context=context).raw
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"role": task.agent.role, "description": task.description, "raw": raw}, f)
+
+        outputs.append(raw)
+        keys.append(key)
+
+    return outputs[-1] if outputs else ""
+
+result = kickoff_cached(project_crew, inputs={})
 print("--- Sequential Workflow Result ---")
 print(result)
\ No newline at end of file
@@ -1,9 +1,16 @@
 import requests
+from langchain.agents import create_agent
 from langchain.tools import tool
+from langchain_ollama import ChatOllama
+# Memoizes @cacheable tool results (see tool_cache.py)
+from tool_cache import ToolCacheMiddleware, cacheable
 
 # --- Configuration ---
 INVENTORY_API_BASE_URL = "http://127.0.0.1:5000/inventory" 
+INVENTORY_CACHE_TTL = 30  # seconds; stock levels move, so keep this short
 
+# Connection failures come back as "ERROR: ..." strings; those must not be cached
+@cacheable(ttl=INVENTORY_CACHE_TTL, should_cache=lambda result: not str(result).startswith("ERROR"))
 @tool
 def check_inventory(product_id: str) -> str:
     """
@@ -34,6 +41,7 @@ def check_inventory(product_id: str) -> str:
 # tools = [check_inventory, calculate_shipping_cost] # (Assuming you keep the shipping tool)
 # ... create the agent and invoke as before ...
 
+@cacheable(ttl=3600)
 @tool
 def calculate_shipping_cost(location: str) -> str:
     """Calculates the shipping cost to a specific location."""
@@ -59,7 +67,9 @@ agent = create_agent(
     model, 
     tools=tools, 
     # System prompt is crucial for guiding the model's tool usage.
-    system_prompt="You are a helpful e-commerce assistant. Use your tools to answer inventory and shipping questions. You must use the tools when relevant."
+    system_prompt="You are a helpful e-commerce assistant. Use your tools to answer inventory and shipping questions. You must use the tools when relevant. If a question needs several tools, call them all in the same turn.",
+    # Repeated inventory/shipping lookups are served from cache; same-turn tool calls already run concurrently
+    middleware=[ToolCacheMiddleware()],
 )
 
 # --- 4. Invoke the Agent (The Agent Loop runs here) ---
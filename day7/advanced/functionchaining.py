@@ -1,12 +1,16 @@
-from langchain_community.chat_models import ChatOllama
+from langchain_ollama import ChatOllama
 from langchain.agents import create_agent
 from langchain.tools import tool
-from langchain.agents.agent_types import AgentType
 from langchain_core.prompts import ChatPromptTemplate
+# Memoizes @cacheable tool results (see tool_cache.py)
+from tool_cache import ToolCacheMiddleware, cacheable
 """
 This takes the basic Agent Executor and gives it tools that are designed to work sequentially. This requires the LLM (Ollama) to perform multi-step reasoning and function chaining (using the output of one tool as the input for the next).
 """
 # --- A. Define Chained Tools ---
+# Each step depends on the previous one, so nothing runs in parallel here; caching means a
+# rerun (or a model that repeats a step) does not reload or recompute the data.
+@cacheable(ttl=600, should_cache=lambda result: not str(result).startswith("Error"))
 @tool
 def load_data_source(file_name: str) -> str:
     """Loads a specified mock file and returns its raw content as a string."""
@@ -15,6 +19,7 @@ def load_data_source(file_name: str) -> str:
         return "TransactionID, Amount, Status\n101, 55.50, New\n102, 120.00, Complete\n103, 55.50, New\n104, 300.00, Complete"
     return "Error: File not found or not supported."
 
+@cacheable(ttl=3600)
 @tool
 def calculate_metrics(raw_data_string: str) -> str:
     """
@@ -57,9 +62,7 @@ agent = create_agent(
     ollama_llm, 
     tools=tools, 
     system_prompt=SYSTEM_PROMPT,
-    # This agent type is excellent for following multi-step reasoning plans
-    agent_type=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
-    verbose=True 
+    middleware=[ToolCacheMiddleware()],
 )
 
 # --- C. Execute ---
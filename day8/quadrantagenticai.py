@@ -1,29 +1,84 @@
 import ollama
 from qdrant_client import QdrantClient, models
+# Reduced first-pass vectors + full-vector rescoring (see quadrantreduced.py)
+from quadrantreduced import create_reduced_collection, query_reduced
 
 client = QdrantClient("http://localhost:6333")
 COLLECTION = "enterprise_v2"
+NO_INFO_ANSWER = "I do not have that information"
+# Store and search reduced vectors; False keeps the plain 768-dim collection
+USE_REDUCTION = True
+
+# Minimum cosine score a hit must reach to count as relevant, per collection.
+# Filled in by calibrate_threshold(); collections without an entry accept every hit.
+SCORE_THRESHOLDS = {}
+
+# Small labelled set used to calibrate the threshold: (question, is_answerable)
+CALIBRATION_SET = [
+    ("What is the budget for Aegis?", True),
+    ("How much money was allocated to Project Aegis?", True),
+    ("Who manages Project Aegis?", True),
+    ("Who is the project manager?", True),
+    ("What is the weather in Paris today?", False),
+    ("How do I reset my laptop password?", False),
+    ("What is the capital of Australia?", False),
+    ("Recommend a good pizza recipe.", False),
+]
 
 def get_embed(text):
     return ollama.embed(model="nomic-embed-text", input=text)['embeddings'][0]
 
 def setup_real_data():
-    if client.collection_exists(COLLECTION): client.delete_collection(COLLECTION)
-    client.create_collection(COLLECTION, vectors_config=models.VectorParams(size=768, distance=models.Distance.COSINE))
-    
     # THE ACTUAL DATA (The only truth)
     real_facts = [
         "Project Aegis has an officially allocated budget of $10,000.",
         "The project manager is Sarah Chen."
     ]
-    points = [models.PointStruct(id=i, vector=get_embed(f), payload={"text": f}) for i, f in enumerate(real_facts)]
-    client.upsert(COLLECTION, points=points)
+    if USE_REDUCTION:
+        create_reduced_collection(COLLECTION, real_facts)
+    else:
+        if client.collection_exists(COLLECTION): client.delete_collection(COLLECTION)
+        client.create_collection(COLLECTION, vectors_config=models.VectorParams(size=768, distance=models.Distance.COSINE))
+        points = [models.PointStruct(id=i, vector=get_embed(f), payload={"text": f}) for i, f in enumerate(real_facts)]
+        client.upsert(COLLECTION, points=points)
     print("✅ Database updated with REAL budget: $10,000")
 
-def search_tool(query):
-    res = client.query_points(COLLECTION, query=get_embed(query), limit=1).points
-    # Safety Check: If nothing is found, return a very clear 'empty' signal
-    if not res: return "DATA_NOT_FOUND"
+def search_collection(text, collection=COLLECTION, limit=1):
+    # With rescoring the scores are full-vector scores, so the thresholds mean the same thing
+    if USE_REDUCTION:
+        return query_reduced(collection, get_embed(text), limit)
+    return client.query_points(collection, query=get_embed(text), limit=limit).points
+
+def top_score(query, collection=COLLECTION):
+    res = search_collection(query, collection)
+    return res[0].score if res else 0.0
+
+def calibrate_threshold(labelled, collection=COLLECTION):
+    """
+    Picks the score cut-off that best separates answerable from unanswerable
+    questions in a small labelled set, and stores it in SCORE_THRESHOLDS.
+    """
+    scored = [(top_score(q, collection), answerable) for q, answerable in labelled]
+    scores = sorted(s for s, _ in scored)
+
+    # Candidate cut-offs sit halfway between neighbouring scores
+    candidates = [(a + b) / 2 for a, b in zip(scores, scores[1:])] or scores
+    best_threshold, best_correct = 0.0, -1
+    for t in candidates:
+        correct = sum((s >= t) == answerable for s, answerable in scored)
+        if correct > best_correct:
+            best_threshold, best_correct = t, correct
+
+    SCORE_THRESHOLDS[collection] = best_threshold
+    print(f"📏 Calibrated threshold for '{collection}': {best_threshold:.3f} "
+          f"({best_correct}/{len(scored)} labelled questions correct)")
+    return best_threshold
+
+def search_tool(query, collection=COLLECTION):
+    res = search_collection(query, collection)
+    # Safety Check: If nothing relevant is found, return a very clear 'empty' signal
+    if not res or res[0].score < SCORE_THRESHOLDS.get(collection, float("-inf")):
+        return "DATA_NOT_FOUND"
     return res[0].payload['text']
 
 def run_grounded_agent(question):
@@ -37,12 +92,20 @@ def run_grounded_agent(question):
     
     # Step 1: Search
     context = search_tool(question)
+
+    # Short circuit: nothing relevant was retrieved, so there is nothing to ground a generation on
+    if context == "DATA_NOT_FOUND":
+        print(f"🏁 REAL ANSWER (no LLM call): {NO_INFO_ANSWER}")
+        return NO_INFO_ANSWER
     
     # Step 2: Final Answer Generation
     prompt = f"{system_rules}\n\nContext: {context}\nUser Question: {question}\nAnswer:"
     response = ollama.generate(model="llama3", prompt=prompt)['response']
     print(f"🏁 REAL ANSWER: {response}")
+    return response
 
 if __name__ == "__main__":
     setup_real_data()
-    run_grounded_agent("What is the budget for Aegis?")
\ No newline at end of file
+    calibrate_threshold(CALIBRATION_SET)
+    run_grounded_agent("What is the budget for Aegis?")
+    run_grounded_agent("What is the stock price of Apple?")
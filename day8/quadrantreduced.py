@@ -0,0 +1,214 @@
+import os
+import time
+import numpy as np
+import ollama
+from qdrant_client import QdrantClient, models
+
+# --- 1. CONFIGURATION ---
+client = QdrantClient("http://localhost:6333")
+COLLECTION = "reduced_knowledge"
+EMBED_MODEL = "nomic-embed-text"
+FULL_DIM = 768
+
+# "matryoshka" keeps the first REDUCED_DIM dims (nomic-embed-text is trained so the
+# leading dims carry most of the meaning), "pca" fits a projection on the corpus,
+# None disables the reduction stage entirely.
+REDUCTION = "matryoshka"
+REDUCED_DIM = 256
+# How many first-pass candidates are rescored with the full vectors
+RESCORE_CANDIDATES = 20
+# Fitted reducers are saved here (one .npz per collection) so a new process can query
+# an existing collection in the same reduced space
+REDUCER_DIR = "reducers"
+
+def get_embeddings(texts):
+    return np.array(ollama.embed(model=EMBED_MODEL, input=texts)['embeddings'], dtype=np.float32)
+
+def normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+# --- 2. THE REDUCTION STAGE ---
+class Reducer:
+    """
+    Shrinks full embeddings to a smaller vector. The same fitted instance must be
+    used at ingestion and at query time so both sides live in the same space.
+    """
+    def __init__(self, method=REDUCTION, dim=REDUCED_DIM):
+        self.method = method
+        self.dim = dim if method else FULL_DIM
+        self.mean = None
+        self.components = None
+
+    def fit(self, vectors):
+        if self.method == "pca":
+            self.mean = vectors.mean(axis=0)
+            # Rows of vt are the principal directions, strongest first
+            _, _, vt = np.linalg.svd(vectors - self.mean, full_matrices=False)
+            if vt.shape[0] < self.dim:
+                raise ValueError(f"PCA needs at least {self.dim} vectors to fit, got {vt.shape[0]}")
+            self.components = vt[:self.dim]
+        return self
+
+    def transform(self, vectors):
+        vectors = np.atleast_2d(vectors)
+        if self.method == "matryoshka":
+            return normalize(vectors[:, :self.dim])
+        if self.method == "pca":
+            if self.components is None:
+                raise RuntimeError("Call fit() before transform() when using PCA")
+            return normalize((vectors - self.mean) @ self.components.T)
+        return normalize(vectors)
+
+    def save(self, path):
+        empty = np.zeros(0, dtype=np.float32)
+        np.savez(
+            path,
+            method=np.array(self.method or ""),
+            dim=np.array(self.dim),
+            mean=empty if self.mean is None else self.mean,
+            components=empty if self.components is None else self.components,
+        )
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        reducer = cls(method=str(data["method"]) or None, dim=int(data["dim"]))
+        if data["components"].size:
+            reducer.mean, reducer.components = data["mean"], data["components"]
+        return reducer
+
+# One fitted reducer per collection (PCA is fitted on that collection's own vectors)
+reducers = {}
+
+def reducer_path(collection):
+    return os.path.join(REDUCER_DIR, f"{collection}.npz")
+
+def get_reducer(collection):
+    """The reducer the collection was built with, loaded from REDUCER_DIR if this process did not build it."""
+    if collection not in reducers:
+        path = reducer_path(collection)
+        if os.path.exists(path):
+            reducers[collection] = Reducer.load(path)
+        elif REDUCTION == "pca":
+            raise RuntimeError(f"No saved PCA reducer for '{collection}' at {path}; rebuild the collection")
+        else:
+            reducers[collection] = Reducer()  # matryoshka / no reduction need no fitting
+    return reducers[collection]
+
+# --- 3. INGESTION ---
+def create_reduced_collection(collection, texts, full=None):
+    """
+    Stores both the reduced vector (for search) and the full vector (for rescoring).
+    Pass `full` if the texts are already embedded. Payloads are {"text": ...}.
+    """
+    full = get_embeddings(texts) if full is None else np.asarray(full, dtype=np.float32)
+    reducer = reducers[collection] = Reducer().fit(full)
+    reduced = reducer.transform(full)
+    os.makedirs(REDUCER_DIR, exist_ok=True)
+    reducer.save(reducer_path(collection))
+
+    if client.collection_exists(collection): client.delete_collection(collection)
+    client.create_collection(
+        collection,
+        vectors_config={
+            "reduced": models.VectorParams(size=reducer.dim, distance=models.Distance.COSINE),
+            # Full vectors are only read for rescoring, so they can live on disk
+            "full": models.VectorParams(size=FULL_DIM, distance=models.Distance.COSINE, on_disk=True),
+        },
+    )
+    points = [
+        models.PointStruct(
+            id=i,
+            vector={"reduced": reduced[i].tolist(), "full": full[i].tolist()},
+            payload={"text": t},
+        )
+        for i, t in enumerate(texts)
+    ]
+    client.upsert(collection, points=points)
+    print(f"✅ Stored {len(points)} points in '{collection}' ({REDUCTION or 'no reduction'}: {FULL_DIM} -> {reducer.dim} dims)")
+
+def setup_collection(texts):
+    create_reduced_collection(COLLECTION, texts)
+
+# --- 4. SEARCH ---
+def query_reduced(collection, full_vector, limit=3, rescore=True):
+    """
+    First pass on reduced vectors, then rescore the candidates with full vectors.
+    With rescoring the returned scores are full-vector cosine scores, so score
+    thresholds calibrated on a full-vector collection still apply.
+    """
+    full_vector = np.asarray(full_vector, dtype=np.float32)
+    reduced = get_reducer(collection).transform(full_vector)[0].tolist()
+
+    if not rescore:
+        return client.query_points(collection, query=reduced, using="reduced", limit=limit).points
+
+    return client.query_points(
+        collection,
+        prefetch=models.Prefetch(query=reduced, using="reduced", limit=max(limit, RESCORE_CANDIDATES)),
+        query=full_vector.tolist(),
+        using="full",
+        limit=limit,
+    ).points
+
+def query_full(collection, full_vector, limit=3):
+    """Reference search on the full vectors only (the old behaviour)."""
+    return client.query_points(collection, query=np.asarray(full_vector).tolist(), using="full", limit=limit).points
+
+def search(query, limit=3, rescore=True):
+    return query_reduced(COLLECTION, get_embeddings([query])[0], limit, rescore)
+
+# --- 5. BENCHMARK ---
+def benchmark(queries, k=3, collection=COLLECTION):
+    """
+    Reports recall@k of the reduced search against full-vector search, plus latency.
+    Queries are embedded once up front, so only the Qdrant search itself is timed.
+    """
+    vectors = get_embeddings(queries)
+    timings = {"full": 0.0, "reduced": 0.0, "reduced+rescore": 0.0}
+    recall = {"reduced": 0.0, "reduced+rescore": 0.0}
+
+    for vector in vectors:
+        start = time.perf_counter()
+        truth = {p.id for p in query_full(collection, vector, k)}
+        timings["full"] += time.perf_counter() - start
+
+        for name, rescore in (("reduced", False), ("reduced+rescore", True)):
+            start = time.perf_counter()
+            found = {p.id for p in query_reduced(collection, vector, k, rescore=rescore)}
+            timings[name] += time.perf_counter() - start
+            recall[name] += len(found & truth) / max(len(truth), 1)
+
+    dim = get_reducer(collection).dim
+    print(f"\n📊 Benchmark over {len(queries)} queries (k={k}, {FULL_DIM} -> {dim} dims, search time only)")
+    print(f"{'mode':<18}{'recall@k':>10}{'avg ms':>10}")
+    print(f"{'full':<18}{1.0:>10.3f}{timings['full'] / len(queries) * 1000:>10.1f}")
+    for name in recall:
+        print(f"{name:<18}{recall[name] / len(queries):>10.3f}{timings[name] / len(queries) * 1000:>10.1f}")
+    print(f"Vector memory per point: {FULL_DIM * 4} bytes -> {dim * 4} bytes searched in RAM")
+
+if __name__ == "__main__":
+    docs = [
+        "Project Aegis has an officially allocated budget of $10,000.",
+        "The project manager is Sarah Chen.",
+        "Our office is located at 123 AI Lane, Tech City.",
+        "The password for the guest WiFi is 'OpenSesame2024'.",
+        "Quarterly bonuses are processed on the 15th of next month.",
+        "The company's server room password is 'Blue-Sky-99'.",
+        "All permanent employees get a quarterly remote work stipend of $350.",
+        "Standard employees accrue 15 days of PTO annually.",
+    ]
+    setup_collection(docs)
+
+    for p in search("Who runs Aegis?"):
+        print(f"🔎 {p.score:.3f}  {p.payload['text']}")
+
+    benchmark([
+        "What is the budget for Aegis?",
+        "Who is the manager?",
+        "Where is the office?",
+        "How do I get on the WiFi?",
+        "When are bonuses paid?",
+        "How many vacation days do I get?",
+    ])